@@ -1,32 +1,127 @@
+import os
+import time
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from anyio import to_thread
+from fastapi import FastAPI, Request
+from fastapi.middleware.gzip import GZipMiddleware
 from loguru import logger
+from sqlalchemy.orm import configure_mappers
 
-from app.models import Base, engine
-from app.routes import admin_auth, course, program, student, teacher
+from app.models import (
+    PRIMARY_COOKIE,
+    READ_YOUR_WRITES_SECONDS,
+    Base,
+    async_engine,
+    engine,
+    replica_engines,
+)
+from app.routes import (
+    admin_auth,
+    announcement,
+    calendar,
+    course,
+    diagnostics,
+    enrollment,
+    export,
+    imports,
+    metrics,
+    program,
+    student,
+    student_request,
+    teacher,
+)
+from app.utils.metrics import METRICS_ENABLED, MetricsMiddleware, instrument_sql
+from app.utils.responses import JSON_RESPONSE_CLASS
+
+# 响应体超过这个字节数才压缩，0 表示不压缩
+RESPONSE_COMPRESSION_MIN_SIZE = int(os.getenv("RESPONSE_COMPRESSION_MIN_SIZE") or 1000)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Load the ML model@app.on_event("startup")
-    logger.info("Creating all tables")
-    Base.metadata.create_all(engine)
+    # 表结构由 alembic 迁移管理；仅本地开发时可用 DB_CREATE_ALL=1 直接建表
+    if os.getenv("DB_CREATE_ALL") == "1":
+        logger.info("Creating all tables")
+        Base.metadata.create_all(engine)
+
+    if os.getenv("LOG_ROUTES") == "1":
+        for route in app.routes:
+            if hasattr(route, "methods"):
+                logger.info(f"{', '.join(route.methods):<10} {route.path}")
 
-    print("\n=== All Available Routes ===")
-    for route in app.routes:
-        if hasattr(route, "methods"):
-            methods = ", ".join(route.methods)
-            print(f"{methods:<10} {route.path}")
-    print("========================\n")
+    # 启动时完成映射配置和 OpenAPI 生成，避免落到第一个请求上
+    if os.getenv("STARTUP_WARMUP", "1") == "1":
+        configure_mappers()
+        app.openapi()
+
+    # 同步路由跑在 anyio 线程池里，默认最多 40 个线程
+    threadpool_workers = os.getenv("THREADPOOL_WORKERS")
+    if threadpool_workers:
+        limiter = to_thread.current_default_thread_limiter()
+        limiter.total_tokens = int(threadpool_workers)
 
     yield
 
+    await async_engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=JSON_RESPONSE_CLASS)
+
+
+if replica_engines:
+
+    @app.middleware("http")
+    async def read_your_writes(request: Request, call_next):
+        response = await call_next(request)
+        # 写请求成功后，短时间内把该客户端的读请求固定到主库
+        is_write = request.method not in ("GET", "HEAD", "OPTIONS")
+        if is_write and response.status_code < 400:
+            response.set_cookie(
+                PRIMARY_COOKIE,
+                str(int(time.time()) + READ_YOUR_WRITES_SECONDS),
+                max_age=READ_YOUR_WRITES_SECONDS,
+                httponly=True,
+            )
+        return response
+
+
+if RESPONSE_COMPRESSION_MIN_SIZE:
+    # 按 Accept-Encoding 协商：装了 brotli-asgi 时优先 br，否则只用 gzip
+    try:
+        from brotli_asgi import BrotliMiddleware
+
+        app.add_middleware(
+            BrotliMiddleware,
+            quality=4,
+            minimum_size=RESPONSE_COMPRESSION_MIN_SIZE,
+            gzip_fallback=True,
+        )
+    except ImportError:
+        app.add_middleware(
+            GZipMiddleware, minimum_size=RESPONSE_COMPRESSION_MIN_SIZE, compresslevel=6
+        )
+
+
+if METRICS_ENABLED:
+    # 最后添加的中间件在最外层，计时包含压缩和其他中间件
+    instrument_sql()
+    app.add_middleware(MetricsMiddleware)
 
-app = FastAPI(lifespan=lifespan)
 
 app.include_router(admin_auth.router, prefix="/admin-auth", tags=["admin-auth"])
 app.include_router(teacher.router, prefix="/teachers", tags=["teachers"])
 app.include_router(course.router, prefix="/courses", tags=["courses"])
 app.include_router(program.router, prefix="/programs", tags=["programs"])
 app.include_router(student.router, prefix="/students", tags=["students"])
+app.include_router(
+    student_request.router, prefix="/student-requests", tags=["student-requests"]
+)
+app.include_router(calendar.router, prefix="/calendar", tags=["calendar"])
+app.include_router(announcement.router, prefix="/announcements", tags=["announcements"])
+app.include_router(enrollment.router, prefix="/enrollments", tags=["enrollments"])
+app.include_router(export.router, prefix="/exports", tags=["exports"])
+app.include_router(imports.router, prefix="/imports", tags=["imports"])
+app.include_router(diagnostics.router, prefix="/diagnostics", tags=["diagnostics"])
+if METRICS_ENABLED:
+    app.include_router(metrics.router, tags=["metrics"])
@@ -0,0 +1,139 @@
+"""Load-test sync vs. async handlers under artificial database latency.
+
+Both handlers run ``SELECT sleep_ms(:ms)`` on a throwaway SQLite database
+(a user-defined function that blocks the connection for ``--latency-ms``), so
+the database behaves like a slow remote server. Requests go through the ASGI
+app in-process; sync handlers are bounded by the threadpool, async ones by
+the connection pool::
+
+    python -m app.async_load_test --latency-ms 200 --concurrency 200 --threads 40
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import httpx
+from anyio import to_thread
+from fastapi import FastAPI
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+SLOW_QUERY = text("SELECT sleep_ms(:ms)")
+
+
+def _sleep_ms(ms):
+    time.sleep(ms / 1000)
+    return ms
+
+
+def add_latency(engine):
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        dbapi_connection.create_function("sleep_ms", 1, _sleep_ms)
+
+
+def build_app(url: str, pool_size: int, latency_ms: float) -> FastAPI:
+    # 和 app.models 一样的同步/异步两套引擎，连接池足够大，不成为瓶颈
+    options = {"pool_size": pool_size, "max_overflow": 0}
+    sync_engine = create_engine(f"sqlite:///{url}", **options)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{url}", **options)
+    add_latency(sync_engine)
+    add_latency(async_engine.sync_engine)
+    SessionLocal = sessionmaker(bind=sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine)
+
+    app = FastAPI()
+
+    @app.get("/sync")
+    def sync_handler():
+        with SessionLocal() as db:
+            db.execute(SLOW_QUERY, {"ms": latency_ms})
+        return {"ok": True}
+
+    @app.get("/async")
+    async def async_handler():
+        async with AsyncSessionLocal() as db:
+            await db.execute(SLOW_QUERY, {"ms": latency_ms})
+        return {"ok": True}
+
+    app.state.engines = (sync_engine, async_engine)
+    return app
+
+
+async def load(app: FastAPI, path: str, requests: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(client: httpx.AsyncClient):
+        async with semaphore:
+            t0 = time.perf_counter()
+            response = await client.get(path)
+            response.raise_for_status()
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        # 先预热，建好连接池里的连接
+        await asyncio.gather(*(one(c) for _ in range(concurrency)))
+        latencies.clear()
+        t0 = time.perf_counter()
+        await asyncio.gather(*(one(c) for _ in range(requests)))
+        elapsed = time.perf_counter() - t0
+
+    latencies.sort()
+    return {
+        "rps": requests / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(len(latencies) * 0.95) - 1],
+    }
+
+
+async def run(args) -> list:
+    # 与 lifespan 中的 THREADPOOL_WORKERS 相同：同步路由最多同时占用这么多线程
+    to_thread.current_default_thread_limiter().total_tokens = args.threads
+    url = os.path.join(tempfile.mkdtemp(), "load.db")
+    app = build_app(url, args.pool_size, args.latency_ms)
+    results = []
+    try:
+        for path in ("/sync", "/async"):
+            results.append(
+                (path, await load(app, path, args.requests, args.concurrency))
+            )
+    finally:
+        sync_engine, async_engine = app.state.engines
+        sync_engine.dispose()
+        await async_engine.dispose()
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency-ms", type=float, default=200)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=40)
+    parser.add_argument("--pool-size", type=int, default=200)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print(
+        f"{args.requests} requests, concurrency {args.concurrency}, "
+        f"db latency {args.latency_ms:.0f} ms, {args.threads} threads, "
+        f"pool {args.pool_size}"
+    )
+    print(f"{'handler':<8} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    for path, stats in results:
+        print(
+            f"{path:<8} {stats['rps']:>9.1f} {stats['p50']:>9.1f} {stats['p95']:>9.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
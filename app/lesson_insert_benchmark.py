@@ -0,0 +1,107 @@
+"""Benchmark writing course lessons: per-object ORM adds vs. bulk_insert_lessons.
+
+Runs against a throwaway SQLite database unless ``--database-url`` is given::
+
+    python -m app.lesson_insert_benchmark --lessons 5000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine, delete, event
+from sqlalchemy.orm import Session
+
+from app.models import Base
+from app.models.models import Course, Lesson, Program, Teacher
+from app.routes.course import CourseSchedule, bulk_insert_lessons
+from app.utils.schedule import expand_schedules
+
+
+def orm_insert(db: Session, course_id: int, starts, ends):
+    # 改造前 create_course 的写法：每节课一个 ORM 对象
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        db.add(Lesson(course_id=course_id, start_time=start, end_time=end))
+    db.commit()
+
+
+def bulk_insert(db: Session, course_id: int, starts, ends):
+    bulk_insert_lessons(db, course_id, starts, ends)
+    db.commit()
+
+
+def setup(engine) -> int:
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        teacher = Teacher(name="教师", email="t@example.com", phone="1")
+        program = Program(category="c", name="项目")
+        db.add_all([teacher, program])
+        db.flush()
+        course = Course(
+            teacher_id=teacher.id, program_id=program.id, schedule=[], comment=None
+        )
+        db.add(course)
+        db.commit()
+        return course.id
+
+
+def timed(engine, func, course_id: int, starts, ends, runs: int):
+    statements = 0
+
+    def count(*args):
+        nonlocal statements
+        statements += 1
+
+    samples = []
+    for _ in range(runs):
+        with Session(engine) as db:
+            db.execute(delete(Lesson))
+            db.commit()
+            event.listen(engine, "before_cursor_execute", count)
+            statements = 0
+            t0 = time.perf_counter()
+            func(db, course_id, starts, ends)
+            samples.append((time.perf_counter() - t0) * 1000)
+            event.remove(engine, "before_cursor_execute", count)
+    return statistics.median(samples), statements
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lessons", type=int, default=5000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    url = args.database_url
+    if url is None:
+        url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    engine = create_engine(url)
+    course_id = setup(engine)
+
+    # 每天一节课，生成 --lessons 节
+    schedule = CourseSchedule(
+        date="2000-01-01", start_time="10:00", end_time="11:00", recurring="daily"
+    )
+    starts, ends = expand_schedules(
+        [schedule], datetime(2000, 1, 1), max_horizon_days=args.lessons
+    )
+    starts, ends = starts[: args.lessons], ends[: args.lessons]
+
+    print(f"{len(starts)} lessons, median of {args.runs}, {engine.url.drivername}")
+    print(f"{'path':<24} {'ms':>9} {'statements':>11}")
+    for name, func in (
+        ("orm db.add", orm_insert),
+        ("bulk_insert_lessons", bulk_insert),
+    ):
+        ms, statements = timed(engine, func, course_id, starts, ends, args.runs)
+        print(f"{name:<24} {ms:>9.1f} {statements:>11}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
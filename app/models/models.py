@@ -1,6 +1,5 @@
 from datetime import datetime
 
-from passlib.context import CryptContext
 from sqlalchemy import (
     JSON,
     TIMESTAMP,
@@ -9,15 +8,16 @@ from sqlalchemy import (
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
 )
 from sqlalchemy.orm import relationship
 
-from . import Base
+from app.utils.passwords import get_pwd_context
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from . import Base
 
 
 class Announcement(Base):
@@ -33,6 +33,7 @@ class Announcement(Base):
 
 class Program(Base):
     __tablename__ = "programs"
+    __table_args__ = (Index("ix_programs_category_name", "category", "name"),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     category = Column(String(255), nullable=False)
@@ -51,6 +52,7 @@ class Program(Base):
 
 class Teacher(Base):
     __tablename__ = "teachers"
+    __table_args__ = (Index("ix_teachers_is_active_id", "is_active", "id"),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(255), nullable=False)
@@ -69,11 +71,14 @@ class Teacher(Base):
 
 class Course(Base):
     __tablename__ = "courses"
+    __table_args__ = (Index("ix_courses_is_active_id", "is_active", "id"),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     teacher_id = Column(Integer, ForeignKey("teachers.id"), nullable=False)
     program_id = Column(Integer, ForeignKey("programs.id"), nullable=False)
     schedule = Column(JSON, nullable=False)
+    # 为 True 时课时按 schedule 规则读取时展开，lessons 表只保存例外
+    virtual_lessons = Column(Boolean, nullable=False, default=False)
     comment = Column(Text, nullable=True)
     is_active = Column(Boolean, default=True)
     created_at = Column(TIMESTAMP, nullable=False, default=datetime.now)
@@ -84,16 +89,23 @@ class Course(Base):
     # 定义关系
     teacher = relationship("Teacher", back_populates="courses")
     program = relationship("Program", back_populates="courses")
-    lessons = relationship("Lesson", back_populates="course")
+    lessons = relationship(
+        "Lesson", back_populates="course", order_by="Lesson.start_time"
+    )
 
 
 class Lesson(Base):
     __tablename__ = "lessons"
+    __table_args__ = (
+        Index("ix_lessons_course_id_start_time", "course_id", "start_time"),
+        Index("ix_lessons_start_time_id", "start_time", "id"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     course_id = Column(Integer, ForeignKey("courses.id"), nullable=False)
     start_time = Column(TIMESTAMP, nullable=False)
     end_time = Column(TIMESTAMP, nullable=False)
+    is_cancelled = Column(Boolean, nullable=False, default=False)
     created_at = Column(TIMESTAMP, nullable=False, default=datetime.now)
     updated_at = Column(
         TIMESTAMP, nullable=False, default=datetime.now, onupdate=datetime.now
@@ -131,15 +143,16 @@ class AdminUser(Base):
 
     @staticmethod
     def verify_password(plain_password, hashed_password):
-        return pwd_context.verify(plain_password, hashed_password)
+        return get_pwd_context().verify(plain_password, hashed_password)
 
     @staticmethod
     def get_password_hash(password):
-        return pwd_context.hash(password)
+        return get_pwd_context().hash(password)
 
 
 class EmailLog(Base):
     __tablename__ = "email_logs"
+    __table_args__ = (Index("ix_email_logs_status_created_at", "status", "created_at"),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     student_id = Column(Integer, ForeignKey("students.id"), nullable=True)
@@ -158,6 +171,9 @@ class EmailLog(Base):
 
 class EnrollmentRequest(Base):
     __tablename__ = "enrollment_requests"
+    __table_args__ = (
+        Index("ix_enrollment_requests_status_created_at", "status", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
@@ -172,6 +188,9 @@ class EnrollmentRequest(Base):
 
 class LeaveRequest(Base):
     __tablename__ = "leave_requests"
+    __table_args__ = (
+        Index("ix_leave_requests_status_created_at", "status", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
@@ -186,6 +205,9 @@ class LeaveRequest(Base):
 
 class WithdrawRequest(Base):
     __tablename__ = "withdraw_requests"
+    __table_args__ = (
+        Index("ix_withdraw_requests_status_created_at", "status", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
@@ -199,6 +221,14 @@ class WithdrawRequest(Base):
 
 class StudentLesson(Base):
     __tablename__ = "student_lessons"
+    __table_args__ = (
+        Index(
+            "ix_student_lessons_student_lesson_active",
+            "student_id",
+            "lesson_id",
+            "is_active",
+        ),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
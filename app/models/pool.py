@@ -0,0 +1,109 @@
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.utils.metrics import record_pool_wait
+
+
+class PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+        # 超出 pool_size 新建的连接数
+        self.overflow_connects = 0
+        self.connects = 0
+        self.invalidations = 0
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def snapshot(self, pool) -> dict:
+        return {
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "in_use": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "checkouts": self.checkouts,
+            "wait_avg_ms": (
+                self.wait_total / self.checkouts * 1000 if self.checkouts else 0.0
+            ),
+            "wait_max_ms": self.wait_max * 1000,
+            "timeouts": self.timeouts,
+            "overflow_connects": self.overflow_connects,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+        }
+
+
+class _InstrumentedPool:
+    """Times every checkout, including the time spent queued for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        # recreate() 会把旧池的 dispatch 连同监听器一起传过来，不能再注册一遍
+        recreated = kwargs.get("_dispatch") is not None
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+        if not recreated:
+            _listen(self.stats, self)
+
+    def recreate(self):
+        # dispose() 会重建连接池，统计数据沿用
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.stats.timeouts += 1
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            self.stats.record_wait(seconds)
+            # 同时计入当前请求，慢请求可以区分是等连接还是等 SQL
+            record_pool_wait(seconds)
+
+    def _inc_overflow(self):
+        acquired = super()._inc_overflow()
+        # _overflow 从 -pool_size 开始计数，大于 0 才是真正的溢出连接
+        if acquired and self._overflow > 0:
+            self.stats.overflow_connects += 1
+        return acquired
+
+
+def _listen(stats: PoolStats, pool) -> None:
+    # 监听器只引用共享的 stats，重建后的连接池沿用同一组监听器
+    @event.listens_for(pool, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        stats.connects += 1
+
+    @event.listens_for(pool, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        stats.invalidations += 1
+
+
+class InstrumentedQueuePool(_InstrumentedPool, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPool, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_stats(engine) -> dict:
+    pool = engine.pool
+    stats = getattr(pool, "stats", None)
+    if stats is None:
+        return {"pool": type(pool).__name__, "status": pool.status()}
+    return stats.snapshot(pool)
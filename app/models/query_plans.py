@@ -0,0 +1,109 @@
+"""EXPLAIN the hot query shapes and fail when one of them needs a full scan.
+
+Run against a migrated database::
+
+    DATABASE_URL=... python -m app.models.query_plans
+"""
+
+import sys
+from datetime import datetime
+
+from sqlalchemy import select
+
+from app.models import engine
+from app.models.models import (
+    Course,
+    EmailLog,
+    EnrollmentRequest,
+    LeaveRequest,
+    Lesson,
+    Program,
+    StudentLesson,
+    Teacher,
+    WithdrawRequest,
+)
+
+
+def hot_queries() -> dict:
+    since = datetime(2000, 1, 1)
+    queries = {
+        "course lessons window": select(Lesson.id)
+        .where(Lesson.course_id.in_([1, 2]), Lesson.start_time >= since)
+        .order_by(Lesson.course_id, Lesson.start_time),
+        "student lesson lookup": select(StudentLesson.id).where(
+            StudentLesson.student_id == 1,
+            StudentLesson.lesson_id == 1,
+            StudentLesson.is_active.is_(True),
+        ),
+        "active courses page": select(Course.id)
+        .where(Course.is_active == 1, Course.id > 0)
+        .order_by(Course.id)
+        .limit(100),
+        "active teachers page": select(Teacher.id)
+        .where(Teacher.is_active == 1, Teacher.id > 0)
+        .order_by(Teacher.id)
+        .limit(100),
+        "program by category and name": select(Program.id).where(
+            Program.category == "c", Program.name == "n"
+        ),
+        "calendar range": select(Lesson.id)
+        .where(Lesson.start_time >= since, Lesson.start_time < datetime(2000, 2, 1))
+        .order_by(Lesson.start_time, Lesson.id)
+        .limit(100),
+        "pending emails": select(EmailLog.id)
+        .where(EmailLog.status == "pending")
+        .order_by(EmailLog.created_at)
+        .limit(100),
+    }
+    for model in (EnrollmentRequest, LeaveRequest, WithdrawRequest):
+        queries[f"pending {model.__tablename__}"] = (
+            select(model.id)
+            .where(model.status == "pending", model.created_at >= since)
+            .order_by(model.created_at)
+            .limit(100)
+        )
+    return queries
+
+
+def _explain(conn, stmt) -> list:
+    compiled = stmt.compile(
+        dialect=conn.dialect, compile_kwargs={"render_postcompile": True}
+    )
+    if conn.dialect.name == "sqlite":
+        sql = "EXPLAIN QUERY PLAN " + str(compiled)
+        params = tuple(compiled.params[key] for key in compiled.positiontup)
+    else:
+        sql = "EXPLAIN " + str(compiled)
+        params = compiled.params
+    return [dict(row._mapping) for row in conn.exec_driver_sql(sql, params)]
+
+
+def full_scans(plan: list, dialect: str) -> list:
+    if dialect == "sqlite":
+        # "SCAN lessons" 是全表扫描，"SCAN x USING INDEX" 是索引扫描
+        return [
+            row["detail"]
+            for row in plan
+            if row["detail"].startswith("SCAN") and "INDEX" not in row["detail"]
+        ]
+    # MySQL 对小表可能仍选择 ALL，只有完全没有可用索引时才算失败
+    return [
+        f"{row['table']}: type=ALL"
+        for row in plan
+        if row.get("type") == "ALL" and not row.get("possible_keys")
+    ]
+
+
+def main() -> int:
+    failed = False
+    with engine.connect() as conn:
+        for name, stmt in hot_queries().items():
+            scans = full_scans(_explain(conn, stmt), conn.dialect.name)
+            status = "FULL SCAN " + "; ".join(scans) if scans else "ok"
+            print(f"{name:<40} {status}")
+            failed = failed or bool(scans)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
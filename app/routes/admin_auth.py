@@ -1,33 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Security
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import get_db
+from app.models import get_async_db
 from app.models.models import AdminUser
-from app.schemas.user import Token, AdminUserCreate, AdminUserLogin, AdminUserResponse
-from app.utils.jwt_utils import create_access_token, get_current_user
+from app.schemas.user import AdminUserCreate, AdminUserLogin, AdminUserResponse, Token
+from app.utils.jwt_utils import (
+    create_access_token,
+    get_current_user,
+    principal_cache,
+    revoke_token,
+    security,
+)
+from app.utils.passwords import hash_password, verify_password
 
 router = APIRouter()
 
 
 @router.post("/register", response_model=Token)
-async def register(user: AdminUserCreate, db: Session = Depends(get_db)):
+async def register(user: AdminUserCreate, db: AsyncSession = Depends(get_async_db)):
     # 检查用户名是否存在
-    if db.query(AdminUser).filter(AdminUser.name == user.name).first():
+    if await db.scalar(select(AdminUser.id).where(AdminUser.name == user.name)):
         raise HTTPException(status_code=400, detail="用户名已存在")
 
     # 检查邮箱是否存在
-    if db.query(AdminUser).filter(AdminUser.email == user.email).first():
+    if await db.scalar(select(AdminUser.id).where(AdminUser.email == user.email)):
         raise HTTPException(status_code=400, detail="邮箱已被注册")
 
     # 创建新用户
     db_user = AdminUser(
         name=user.name,
         email=user.email,
-        password_hash=AdminUser.get_password_hash(user.password),
+        password_hash=await hash_password(user.password),
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
 
     # 生成访问令牌
     access_token = create_access_token(db_user.id)
@@ -35,20 +44,45 @@ async def register(user: AdminUserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=Token)
-async def login(user_data: AdminUserLogin, db: Session = Depends(get_db)):
-    user = db.query(AdminUser).filter(AdminUser.email == user_data.email).first()
-    if not user or not AdminUser.verify_password(user_data.password, user.password_hash):
+async def login(user_data: AdminUserLogin, db: AsyncSession = Depends(get_async_db)):
+    user = await db.scalar(select(AdminUser).where(AdminUser.email == user_data.email))
+    if not user:
+        raise HTTPException(status_code=401, detail="用户名或密码错误")
+
+    valid, new_hash = await verify_password(user_data.password, user.password_hash)
+    if not valid:
         raise HTTPException(status_code=401, detail="用户名或密码错误")
 
+    # cost 调整后透明地重新哈希
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
+
     access_token = create_access_token(user.id)
     return Token(access_token=access_token)
 
 
 @router.get("/me", response_model=AdminUserResponse)
 async def read_users_me(
-    current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    user = db.query(AdminUser).filter(AdminUser.id == current_user["user_id"]).first()
+    principal = principal_cache.get(current_user["user_id"])
+    if principal is not None:
+        return principal
+
+    user = await db.get(AdminUser, current_user["user_id"])
     if not user:
         raise HTTPException(status_code=404, detail="用户不存在")
-    return user
+
+    principal = AdminUserResponse.model_validate(user).model_dump()
+    principal_cache.set(
+        current_user["user_id"], principal, expires_at=current_user.get("exp")
+    )
+    return principal
+
+
+@router.post("/logout")
+async def logout(credentials: HTTPAuthorizationCredentials = Security(security)):
+    revoke_token(credentials.credentials)
+    return {"success": True}
@@ -0,0 +1,312 @@
+import re
+import threading
+import time
+from bisect import bisect_right
+from datetime import datetime
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import insert, literal, select
+from sqlalchemy.orm import Session
+
+from app.models import SessionLocal, get_db
+from app.models.models import Announcement, EmailLog, Student, Teacher
+from app.utils.cache import ReadThroughCache
+from app.utils.jwt_utils import get_current_user
+from app.utils.pagination import paginate, sort_keys
+
+router = APIRouter()
+
+announcement_cache = ReadThroughCache("announcements")
+
+
+class AnnouncementBase(BaseModel):
+    summary: str
+    # 多个收件人用逗号或分号分隔
+    to_email: Optional[str] = None
+    is_active: bool = True
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+
+
+class AnnouncementCreate(AnnouncementBase):
+    pass
+
+
+class AnnouncementResponse(AnnouncementBase):
+    id: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ResponseAnnouncementList(BaseModel):
+    items: List[AnnouncementResponse]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+
+class AnnouncementSend(BaseModel):
+    # 除 to_email 外，再群发给全部学生或全部在职教师
+    audience: Optional[Literal["students", "teachers"]] = None
+
+
+class AnnouncementSendResponse(BaseModel):
+    queued: int
+
+
+def announcement_to_dict(db_announcement: Announcement) -> dict:
+    response = AnnouncementResponse.model_validate(
+        db_announcement, from_attributes=True
+    )
+    return response.model_dump(mode="json")
+
+
+def load_active() -> List[dict]:
+    db = SessionLocal()
+    try:
+        return [
+            announcement_to_dict(i)
+            for i in db.query(Announcement).filter(Announcement.is_active.is_(True))
+        ]
+    finally:
+        db.close()
+
+
+class AnnouncementFeed:
+    """Active announcements sorted by start time, held in memory.
+
+    The list is reloaded when the cache generation changes (some announcement
+    was written) or, since the in-memory generation is per process, at the
+    latest after the cache TTL so writes made by other workers show up; the
+    live subset is recomputed in memory when the clock passes the next
+    start/end boundary.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.key = None
+        self.items: List[dict] = []
+        self.starts: List[datetime] = []
+        self.boundaries: List[datetime] = []
+        self.current: List[dict] = []
+        self.valid_until: Optional[datetime] = None
+        self.loaded_at = 0.0
+
+    def _load(self, items: List[dict]):
+        parsed = []
+        for item in items:
+            item = dict(item)
+            for field in ("start_time", "end_time"):
+                if item[field] is not None:
+                    item[field] = datetime.fromisoformat(item[field])
+            parsed.append(item)
+        parsed.sort(key=lambda i: (i["start_time"] or datetime.min, i["id"]))
+        self.items = parsed
+        self.starts = [i["start_time"] or datetime.min for i in parsed]
+        self.boundaries = sorted(
+            {t for i in parsed for t in (i["start_time"], i["end_time"]) if t}
+        )
+
+    def _refresh(self, now: datetime):
+        # 已开始的公告是按开始时间排好序的前缀，只需再排除已结束的
+        started = self.items[: bisect_right(self.starts, now)]
+        current = [i for i in started if i["end_time"] is None or now < i["end_time"]]
+        current.reverse()
+        self.current = current
+        index = bisect_right(self.boundaries, now)
+        self.valid_until = (
+            self.boundaries[index] if index < len(self.boundaries) else None
+        )
+
+    def get(self, now: Optional[datetime] = None) -> List[dict]:
+        now = now or datetime.now()
+        key = announcement_cache.list_key(active=True)
+        with self.lock:
+            expired = time.monotonic() - self.loaded_at >= announcement_cache.ttl
+            if key != self.key or expired:
+                # 到期后直接查库，不读可能同样过期的缓存
+                items = (
+                    announcement_cache.get_or_load(key, load_active)
+                    if key != self.key
+                    else load_active()
+                )
+                self._load(items)
+                self.key = key
+                self.loaded_at = time.monotonic()
+                self._refresh(now)
+            elif self.valid_until is not None and now >= self.valid_until:
+                self._refresh(now)
+            return self.current
+
+
+feed = AnnouncementFeed()
+
+
+def check_window(announcement: AnnouncementBase):
+    if (
+        announcement.start_time
+        and announcement.end_time
+        and announcement.end_time <= announcement.start_time
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="结束时间必须晚于开始时间"
+        )
+
+
+def get_announcement_or_404(db: Session, announcement_id: int) -> Announcement:
+    db_announcement = db.get(Announcement, announcement_id)
+    if not db_announcement:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="公告未找到")
+    return db_announcement
+
+
+# 当前生效的公告，不查数据库
+@router.get("/current", response_model=ResponseAnnouncementList)
+def get_current_announcements():
+    return {"items": feed.get()}
+
+
+@router.get("", response_model=ResponseAnnouncementList)
+def list_announcements(
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    with_total: bool = False,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    return paginate(
+        db.query(Announcement),
+        sort_keys(Announcement),
+        limit,
+        cursor,
+        skip,
+        with_total,
+    )
+
+
+@router.post(
+    "", response_model=AnnouncementResponse, status_code=status.HTTP_201_CREATED
+)
+def create_announcement(
+    announcement: AnnouncementCreate,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    check_window(announcement)
+    db_announcement = Announcement(**announcement.model_dump())
+    db.add(db_announcement)
+    db.commit()
+    db.refresh(db_announcement)
+    announcement_cache.invalidate()
+    return db_announcement
+
+
+@router.get("/{announcement_id}", response_model=AnnouncementResponse)
+def get_announcement(
+    announcement_id: int,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    return get_announcement_or_404(db, announcement_id)
+
+
+@router.put("/{announcement_id}", response_model=AnnouncementResponse)
+def update_announcement(
+    announcement_id: int,
+    announcement: AnnouncementCreate,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    check_window(announcement)
+    db_announcement = get_announcement_or_404(db, announcement_id)
+    for key, value in announcement.model_dump().items():
+        setattr(db_announcement, key, value)
+    db.commit()
+    db.refresh(db_announcement)
+    announcement_cache.invalidate()
+    return db_announcement
+
+
+@router.delete("/{announcement_id}")
+def delete_announcement(
+    announcement_id: int,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    db_announcement = get_announcement_or_404(db, announcement_id)
+    db_announcement.is_active = False
+    db.commit()
+    announcement_cache.invalidate()
+    return {"success": True}
+
+
+@router.post("/{announcement_id}/send", response_model=AnnouncementSendResponse)
+def send_announcement(
+    announcement_id: int,
+    send: AnnouncementSend,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    db_announcement = get_announcement_or_404(db, announcement_id)
+    summary = db_announcement.summary
+    subject = summary.strip().splitlines()[0][:255] if summary.strip() else "公告"
+    now = datetime.now()
+
+    # 邮件只写入 email_logs，由 email worker 异步发送
+    queued = 0
+    recipients = list(
+        dict.fromkeys(
+            i.strip()
+            for i in re.split(r"[,;]", db_announcement.to_email or "")
+            if i.strip()
+        )
+    )
+    if recipients:
+        db.execute(
+            insert(EmailLog),
+            [
+                {
+                    "to_email": to_email,
+                    "subject": subject,
+                    "body": summary,
+                    "status": "pending",
+                    "created_at": now,
+                }
+                for to_email in recipients
+            ],
+        )
+        queued += len(recipients)
+
+    if send.audience is not None:
+        # INSERT ... SELECT，收件人不经过应用内存
+        model = Student if send.audience == "students" else Teacher
+        owner = EmailLog.student_id if model is Student else EmailLog.teacher_id
+        source = select(
+            model.id,
+            model.email,
+            literal(subject),
+            literal(summary),
+            literal("pending"),
+            literal(now),
+        )
+        if model is Teacher:
+            source = source.where(Teacher.is_active.is_(True))
+        result = db.execute(
+            insert(EmailLog).from_select(
+                [
+                    owner,
+                    EmailLog.to_email,
+                    EmailLog.subject,
+                    EmailLog.body,
+                    EmailLog.status,
+                    EmailLog.created_at,
+                ],
+                source,
+            )
+        )
+        queued += result.rowcount
+
+    db.commit()
+    return {"queued": queued}
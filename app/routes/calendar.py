@@ -0,0 +1,254 @@
+import heapq
+import itertools
+from datetime import datetime
+from typing import Iterator, List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.orm import Session, contains_eager
+
+from app.models import ReadSessionLocal, get_read_db
+from app.models.models import Course, Lesson, Program, StudentLesson, Teacher
+from app.routes.course import (
+    LessonResponse,
+    ProgramResponse,
+    TeacherResponse,
+    course_schedules,
+)
+from app.utils.pagination import after, decode_cursor, encode_cursor
+from app.utils.responses import json_line, trusted_response
+from app.utils.schedule import expand_schedules
+
+router = APIRouter()
+
+# 流式输出时每次从数据库取的行数
+CALENDAR_STREAM_BATCH_SIZE = 1000
+
+# 排序键；同一门课同一时间只有一节课，虚拟课时的 id 按 0 参与比较
+CALENDAR_KEYS = [Lesson.start_time, Lesson.course_id, Lesson.id]
+
+
+class CalendarLesson(LessonResponse):
+    course_id: int
+    teacher: TeacherResponse
+    program: ProgramResponse
+
+
+class CalendarResponse(BaseModel):
+    items: List[CalendarLesson]
+    next_cursor: Optional[str] = None
+
+
+class CalendarFilter(BaseModel):
+    start: datetime
+    end: datetime
+    teacher_id: Optional[int] = None
+    program_id: Optional[int] = None
+    course_id: Optional[int] = None
+    student_id: Optional[int] = None
+
+    def course_clauses(self) -> list:
+        clauses = [Course.is_active == 1]
+        if self.teacher_id is not None:
+            clauses.append(Course.teacher_id == self.teacher_id)
+        if self.program_id is not None:
+            clauses.append(Course.program_id == self.program_id)
+        if self.course_id is not None:
+            clauses.append(Course.id == self.course_id)
+        return clauses
+
+
+def _sort_key(entry: dict) -> tuple:
+    return entry["start_time"], entry["course_id"], entry["id"] or 0
+
+
+def _entry(lesson_id, course_id, start_time, end_time, teacher, program) -> dict:
+    return {
+        "id": lesson_id,
+        "course_id": course_id,
+        "start_time": start_time,
+        "end_time": end_time,
+        "teacher": teacher,
+        "program": program,
+    }
+
+
+def stored_lessons(
+    db: Session,
+    filters: CalendarFilter,
+    cursor_values: Optional[list] = None,
+    limit: Optional[int] = None,
+) -> Iterator[dict]:
+    # 一条按 start_time 的范围扫描，教师/项目名直接 join 出来
+    stmt = (
+        select(
+            Lesson.id,
+            Lesson.course_id,
+            Lesson.start_time,
+            Lesson.end_time,
+            Teacher.id.label("teacher_id"),
+            Teacher.name.label("teacher_name"),
+            Program.id.label("program_id"),
+            Program.name.label("program_name"),
+        )
+        .join(Course, Course.id == Lesson.course_id)
+        .join(Teacher, Teacher.id == Course.teacher_id)
+        .join(Program, Program.id == Course.program_id)
+        .where(
+            Lesson.start_time >= filters.start,
+            Lesson.start_time < filters.end,
+            Lesson.is_cancelled.is_(False),
+            *filters.course_clauses(),
+        )
+        .order_by(*CALENDAR_KEYS)
+    )
+    if filters.student_id is not None:
+        stmt = stmt.where(
+            Lesson.id.in_(
+                select(StudentLesson.lesson_id).where(
+                    StudentLesson.student_id == filters.student_id,
+                    StudentLesson.is_active.is_(True),
+                )
+            )
+        )
+    if cursor_values:
+        stmt = stmt.where(after(CALENDAR_KEYS, cursor_values))
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    else:
+        stmt = stmt.execution_options(yield_per=CALENDAR_STREAM_BATCH_SIZE)
+
+    for row in db.execute(stmt):
+        yield _entry(
+            row.id,
+            row.course_id,
+            row.start_time,
+            row.end_time,
+            {"id": row.teacher_id, "name": row.teacher_name},
+            {"id": row.program_id, "name": row.program_name},
+        )
+
+
+def virtual_occurrences(
+    db: Session,
+    filters: CalendarFilter,
+    cursor_values: Optional[list] = None,
+    limit: Optional[int] = None,
+) -> List[dict]:
+    # 虚拟课时没有选课记录，按学生过滤时不会出现
+    if filters.student_id is not None:
+        return []
+
+    courses = (
+        db.query(Course)
+        .filter(Course.virtual_lessons.is_(True), *filters.course_clauses())
+        .join(Course.teacher)
+        .join(Course.program)
+        .options(contains_eager(Course.teacher), contains_eager(Course.program))
+        .all()
+    )
+    if not courses:
+        return []
+
+    start = filters.start
+    if cursor_values:
+        start = max(start, cursor_values[0])
+    # 落库的例外行（含已取消的）覆盖同一时间的规则课时
+    overridden = set(
+        db.execute(
+            select(Lesson.course_id, Lesson.start_time).where(
+                Lesson.course_id.in_([course.id for course in courses]),
+                Lesson.start_time >= start,
+                Lesson.start_time < filters.end,
+            )
+        ).all()
+    )
+
+    cursor_key = tuple(cursor_values) if cursor_values else None
+    entries = []
+    for course in courses:
+        starts, ends = expand_schedules(course_schedules(course), start, filters.end)
+        teacher = {"id": course.teacher.id, "name": course.teacher.name}
+        program = {"id": course.program.id, "name": course.program.name}
+        course_entries = (
+            _entry(None, course.id, start_time, end_time, teacher, program)
+            for start_time, end_time in zip(starts.tolist(), ends.tolist())
+            if start_time < filters.end
+            and (course.id, start_time) not in overridden
+            and (cursor_key is None or (start_time, course.id, 0) > cursor_key)
+        )
+        entries.extend(itertools.islice(course_entries, limit))
+    entries.sort(key=_sort_key)
+    return entries[:limit]
+
+
+def calendar_entries(
+    db: Session,
+    filters: CalendarFilter,
+    cursor_values: Optional[list] = None,
+    limit: Optional[int] = None,
+) -> Iterator[dict]:
+    merged = heapq.merge(
+        stored_lessons(db, filters, cursor_values, limit),
+        virtual_occurrences(db, filters, cursor_values, limit),
+        key=_sort_key,
+    )
+    return itertools.islice(merged, limit)
+
+
+def stream_calendar(
+    filters: CalendarFilter, cursor_values: Optional[list], primary: bool
+) -> Iterator[bytes]:
+    # 依赖注入的 session 在响应开始前就会关闭，流式输出用自己的 session
+    db = ReadSessionLocal()
+    if primary:
+        db.info["primary"] = True
+    try:
+        for entry in calendar_entries(db, filters, cursor_values):
+            yield json_line(entry)
+    finally:
+        db.close()
+
+
+@router.get("", response_model=CalendarResponse)
+def get_calendar(
+    start: datetime,
+    end: datetime,
+    teacher_id: Optional[int] = None,
+    program_id: Optional[int] = None,
+    course_id: Optional[int] = None,
+    student_id: Optional[int] = None,
+    limit: int = Query(500, ge=1, le=5000),
+    cursor: Optional[str] = None,
+    format: Literal["json", "ndjson"] = "json",
+    db: Session = Depends(get_read_db),
+):
+    if end <= start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="结束时间必须晚于开始时间"
+        )
+    filters = CalendarFilter(
+        start=start,
+        end=end,
+        teacher_id=teacher_id,
+        program_id=program_id,
+        course_id=course_id,
+        student_id=student_id,
+    )
+    cursor_values = decode_cursor(CALENDAR_KEYS, cursor) if cursor else None
+
+    # 大范围查询按 NDJSON 逐行输出，不受 limit 限制
+    if format == "ndjson":
+        return StreamingResponse(
+            stream_calendar(filters, cursor_values, db.info.get("primary", False)),
+            media_type="application/x-ndjson",
+        )
+
+    items = list(calendar_entries(db, filters, cursor_values, limit))
+    next_cursor = None
+    if len(items) == limit:
+        last = items[-1]
+        next_cursor = encode_cursor(CALENDAR_KEYS, {**last, "id": last["id"] or 0})
+    return trusted_response({"items": items, "next_cursor": next_cursor})
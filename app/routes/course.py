@@ -1,15 +1,33 @@
-from datetime import datetime, timedelta
-from typing import List, Literal, Optional
-
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel, model_validator
+import os
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+from typing import Dict, List, Literal, Optional, Tuple
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from sqlalchemy import func, insert, select
 from sqlalchemy.orm import Session, joinedload
 
-from app.models import get_db
-from app.models.models import Course, Lesson
+from app.models import get_db, get_read_db
+from app.models.models import Course, Lesson, Program, Teacher
+from app.utils.etag import not_modified, resource_version
+from app.utils.intervals import IntervalIndex
+from app.utils.pagination import paginate, sort_keys
+from app.utils.responses import trusted_response
+from app.utils.schedule import expand_schedules
 
 router = APIRouter()
 
+# 单条 INSERT 语句写入的最大课时数
+LESSON_INSERT_BATCH_SIZE = 1000
+# 新建课程默认是否使用虚拟课时（按规则展开，不落库）
+VIRTUAL_LESSONS = os.getenv("VIRTUAL_LESSONS") == "1"
+# 虚拟课程没有指定时间窗口时默认展开的天数
+VIRTUAL_LESSON_WINDOW_DAYS = int(os.getenv("VIRTUAL_LESSON_WINDOW_DAYS") or 90)
+
 
 class LessonBase(BaseModel):
     start_time: datetime
@@ -21,7 +39,8 @@ class LessonCreate(LessonBase):
 
 
 class LessonResponse(LessonBase):
-    id: int
+    # 虚拟课时尚未落库，没有 id
+    id: Optional[int] = None
 
 
 class ResponseLessonList(BaseModel):
@@ -46,6 +65,7 @@ class CourseSchedule(BaseModel):
 
 class CourseCreate(CourseBase):
     schedule: List[CourseSchedule]
+    virtual_lessons: Optional[bool] = None
 
 
 class CourseUpdate(CourseBase):
@@ -66,113 +86,433 @@ class CourseResponse(CourseBase):
     id: int
     created_at: datetime
     updated_at: datetime
+    virtual_lessons: bool = False
     lessons: List[LessonResponse] = []
     teacher: TeacherResponse
     program: ProgramResponse
 
-    @model_validator(mode="after")
-    def order_lessons(self):
-        self.lessons.sort(key=lambda x: x.start_time)
-        return self
+    lesson_count: int = 0
 
 
 class CourseListResponse(BaseModel):
     items: List[CourseResponse]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
 
 
-def generate_schedule(schedule: CourseSchedule) -> List[str]:
-    start_date = datetime.strptime(schedule.date, "%Y-%m-%d")
-    end_date = (
-        datetime.strptime(schedule.recurring_end_date, "%Y-%m-%d")
-        if schedule.recurring_end_date
-        else None
-    )
+# CourseResponse 里直接取自 courses 表的字段
+COURSE_COLUMNS = [
+    name
+    for name in CourseResponse.model_fields
+    if name not in ("lessons", "teacher", "program", "lesson_count")
+]
 
-    start_time = schedule.start_time
-    end_time = schedule.end_time
+# 课程列表的投影：只取响应需要的列，虚拟课程展开课时还要用到 schedule
+COURSE_LIST_COLUMNS = [
+    *(getattr(Course, name) for name in COURSE_COLUMNS),
+    Course.schedule,
+    Teacher.name.label("teacher_name"),
+    Teacher.updated_at.label("teacher_updated_at"),
+    Program.name.label("program_name"),
+    Program.updated_at.label("program_updated_at"),
+]
 
-    current_date = start_date
-    schedule_dates = []
 
-    while end_date is None or current_date <= end_date:
-        schedule_dates.append(
-            {
-                "start": f"{current_date.strftime('%Y-%m-%d')} {start_time}:00",
-                "end": f"{current_date.strftime('%Y-%m-%d')} {end_time}:00",
-            }
-        )
+class ConflictingLesson(LessonResponse):
+    course_id: int
 
-        if schedule.recurring == "daily":
-            current_date += timedelta(days=1)
-        elif schedule.recurring == "weekly":
-            current_date += timedelta(weeks=1)
-        elif schedule.recurring == "monthly":
-            next_month = current_date.month % 12 + 1
-            year = current_date.year + (1 if next_month == 1 else 0)
-            current_date = current_date.replace(year=year, month=next_month)
-        elif schedule.recurring == "weekdays":
-            current_date += timedelta(days=1)
-            while current_date.weekday() in [5, 6]:  # Skip weekends
-                current_date += timedelta(days=1)
-        elif schedule.recurring == "weekends":
-            current_date += timedelta(days=1)
-            while current_date.weekday() not in [5, 6]:  # Skip weekdays
-                current_date += timedelta(days=1)
-
-    return schedule_dates
 
+class LessonConflict(LessonBase):
+    conflicts_with: ConflictingLesson
 
-@router.get("", response_model=CourseListResponse)
-def list_courses(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+
+class ConflictReport(BaseModel):
+    lesson_count: int
+    conflicts: List[LessonConflict]
+
+
+def bulk_insert_lessons(db: Session, course_id: int, starts, ends) -> int:
+    rows = [
+        {"course_id": course_id, "start_time": start, "end_time": end}
+        for start, end in zip(starts.tolist(), ends.tolist())
+    ]
+    # 多行 INSERT，按批次写入，不经过 ORM 的 unit of work
+    for i in range(0, len(rows), LESSON_INSERT_BATCH_SIZE):
+        db.execute(insert(Lesson), rows[i : i + LESSON_INSERT_BATCH_SIZE])
+    return len(rows)
+
+
+def course_schedules(course: Course) -> List[CourseSchedule]:
+    return [CourseSchedule.model_validate(i) for i in course.schedule]
+
+
+def merge_virtual_lessons(starts, ends, stored: List[Lesson]) -> List[dict]:
+    # 落库的行按 start_time 覆盖规则展开出的课时，取消的行直接去掉
+    overridden = {lesson.start_time for lesson in stored}
+    lessons = [
+        {"id": lesson.id, "start_time": lesson.start_time, "end_time": lesson.end_time}
+        for lesson in stored
+        if not lesson.is_cancelled
+    ]
+    lessons.extend(
+        {"id": None, "start_time": start, "end_time": end}
+        for start, end in zip(starts.tolist(), ends.tolist())
+        if start not in overridden
+    )
+    lessons.sort(key=lambda x: x["start_time"])
+    return lessons
+
+
+def virtual_window(
+    lessons_from: Optional[datetime], lessons_to: Optional[datetime]
+) -> Tuple[datetime, datetime]:
+    window = timedelta(days=VIRTUAL_LESSON_WINDOW_DAYS)
+    if lessons_from is None:
+        lessons_from = (
+            lessons_to - window
+            if lessons_to
+            else datetime.combine(datetime.now().date(), datetime.min.time())
+        )
+    if lessons_to is None:
+        lessons_to = lessons_from + window
+    return lessons_from, lessons_to
+
+
+def lesson_window(
+    lessons_from: Optional[datetime], lessons_to: Optional[datetime]
+) -> list:
+    clauses = []
+    if lessons_from is not None:
+        clauses.append(Lesson.start_time >= lessons_from)
+    if lessons_to is not None:
+        clauses.append(Lesson.start_time <= lessons_to)
+    return clauses
+
+
+def materialized_lessons(
+    db: Session,
+    course_ids: List[int],
+    lessons_from: Optional[datetime] = None,
+    lessons_to: Optional[datetime] = None,
+    max_lessons: Optional[int] = None,
+) -> Dict[int, Tuple[List[dict], int]]:
+    # 一条语句取出所有课程的课时：窗口函数在库里排序、截断并统计每门课的课时数
+    ranked = (
+        select(
+            Lesson.id,
+            Lesson.course_id,
+            Lesson.start_time,
+            Lesson.end_time,
+            func.row_number()
+            .over(
+                partition_by=Lesson.course_id,
+                order_by=(Lesson.start_time, Lesson.id),
+            )
+            .label("rn"),
+            func.count().over(partition_by=Lesson.course_id).label("lesson_count"),
+        )
+        .where(
+            Lesson.course_id.in_(course_ids),
+            Lesson.is_cancelled.is_(False),
+            *lesson_window(lessons_from, lessons_to),
+        )
+        .subquery()
+    )
+    stmt = select(ranked).order_by(ranked.c.course_id, ranked.c.rn)
+    if max_lessons is not None:
+        stmt = stmt.where(ranked.c.rn <= max_lessons)
+
+    result = {}
+    for row in db.execute(stmt):
+        lessons, _ = result.setdefault(row.course_id, ([], row.lesson_count))
+        lessons.append(
+            {"id": row.id, "start_time": row.start_time, "end_time": row.end_time}
+        )
+    return result
+
+
+def virtual_lessons(
+    db: Session,
+    courses: List[Course],
+    lessons_from: Optional[datetime] = None,
+    lessons_to: Optional[datetime] = None,
+    max_lessons: Optional[int] = None,
+) -> Dict[int, Tuple[List[dict], int]]:
+    lessons_from, lessons_to = virtual_window(lessons_from, lessons_to)
+    stored = defaultdict(list)
+    for lesson in db.query(Lesson).filter(
+        Lesson.course_id.in_([course.id for course in courses]),
+        *lesson_window(lessons_from, lessons_to),
+    ):
+        stored[lesson.course_id].append(lesson)
+
+    result = {}
+    for course in courses:
+        starts, ends = expand_schedules(
+            course_schedules(course), lessons_from, lessons_to
+        )
+        lessons = merge_virtual_lessons(starts, ends, stored[course.id])
+        result[course.id] = (lessons[:max_lessons], len(lessons))
+    return result
+
+
+def load_lessons(
+    db: Session,
+    courses: List[Course],
+    lessons_from: Optional[datetime] = None,
+    lessons_to: Optional[datetime] = None,
+    max_lessons: Optional[int] = None,
+) -> Dict[int, Tuple[List[dict], int]]:
+    result = {course.id: ([], 0) for course in courses}
+    materialized = [course.id for course in courses if not course.virtual_lessons]
+    virtual = [course for course in courses if course.virtual_lessons]
+    if materialized:
+        result.update(
+            materialized_lessons(
+                db, materialized, lessons_from, lessons_to, max_lessons
+            )
+        )
+    if virtual:
+        result.update(
+            virtual_lessons(db, virtual, lessons_from, lessons_to, max_lessons)
+        )
+    return result
+
+
+def teacher_lessons(
+    db: Session, teacher_id: int, window_start: datetime, window_end: datetime
+) -> List[dict]:
+    # 课时不跨天，往前多取一天就能覆盖窗口开始前上课、窗口内下课的课时
+    window_start = window_start - timedelta(days=1)
     courses = (
         db.query(Course)
+        .filter(Course.teacher_id == teacher_id, Course.is_active == 1)
+        .all()
+    )
+    stored = defaultdict(list)
+    for lesson in db.query(Lesson).filter(
+        Lesson.course_id.in_([course.id for course in courses]),
+        Lesson.start_time >= window_start,
+        Lesson.start_time <= window_end,
+    ):
+        stored[lesson.course_id].append(lesson)
+
+    result = []
+    for course in courses:
+        if course.virtual_lessons:
+            starts, ends = expand_schedules(
+                course_schedules(course), window_start, window_end
+            )
+            lessons = merge_virtual_lessons(starts, ends, stored[course.id])
+        else:
+            lessons = [
+                {"id": i.id, "start_time": i.start_time, "end_time": i.end_time}
+                for i in stored[course.id]
+                if not i.is_cancelled
+            ]
+        result.extend(dict(lesson, course_id=course.id) for lesson in lessons)
+    return result
+
+
+def find_conflicts(db: Session, teacher_id: int, starts, ends) -> List[dict]:
+    # 教师已有课时建一次有序区间索引，新课时逐个二分查找，不做两两比较
+    if not len(starts):
+        return []
+    existing = teacher_lessons(db, teacher_id, starts.min().item(), ends.max().item())
+    index = IntervalIndex(
+        [lesson["start_time"] for lesson in existing],
+        [lesson["end_time"] for lesson in existing],
+    )
+    return [
+        {
+            "start_time": starts[i].item(),
+            "end_time": ends[i].item(),
+            "conflicts_with": existing[j],
+        }
+        for i, j in sorted(index.overlaps(starts, ends))
+    ]
+
+
+def conflict_error(conflicts: List[dict]) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail={"message": "教师时间冲突", "conflicts": jsonable_encoder(conflicts)},
+    )
+
+
+def expand_request_schedule(schedule: List[CourseSchedule]):
+    # 请求里的日期、时间格式不对时返回 400，而不是 500
+    try:
+        return expand_schedules(schedule)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+def lock_teacher(db: Session, teacher_id: int):
+    # 同一教师的排课串行化，检查和写入之间不会插进别的课时
+    db.query(Teacher.id).filter(Teacher.id == teacher_id).with_for_update().first()
+
+
+def course_row(row) -> SimpleNamespace:
+    # 投影行包装成和 Course 一样的属性访问，load_lessons / courses_version 可以直接用
+    data = row._asdict()
+    teacher = SimpleNamespace(
+        id=data["teacher_id"],
+        name=data.pop("teacher_name"),
+        updated_at=data.pop("teacher_updated_at"),
+    )
+    program = SimpleNamespace(
+        id=data["program_id"],
+        name=data.pop("program_name"),
+        updated_at=data.pop("program_updated_at"),
+    )
+    return SimpleNamespace(**data, teacher=teacher, program=program)
+
+
+def course_payload(
+    course: Course, lessons: List[dict], lesson_count: Optional[int] = None
+) -> dict:
+    # 按 CourseResponse 的字段顺序组装，可以不经校验直接序列化
+    data = {name: getattr(course, name) for name in COURSE_COLUMNS}
+    data.update(
+        lessons=lessons,
+        teacher={"id": course.teacher.id, "name": course.teacher.name},
+        program={"id": course.program.id, "name": course.program.name},
+        lesson_count=len(lessons) if lesson_count is None else lesson_count,
+    )
+    return data
+
+
+def course_with_lessons(
+    db: Session,
+    course: Course,
+    lessons_from: Optional[datetime] = None,
+    lessons_to: Optional[datetime] = None,
+) -> dict:
+    lessons, lesson_count = load_lessons(db, [course], lessons_from, lessons_to)[
+        course.id
+    ]
+    return course_payload(course, lessons, lesson_count)
+
+
+def courses_version(db: Session, courses: List[Course], *parts) -> dict:
+    # 课程、教师、项目的 updated_at 来自已经查出的行，课时只做一次聚合
+    course_ids = [course.id for course in courses]
+    lesson_updated_at, lesson_count = None, 0
+    if course_ids:
+        lesson_updated_at, lesson_count = db.execute(
+            select(func.max(Lesson.updated_at), func.count(Lesson.id)).where(
+                Lesson.course_id.in_(course_ids)
+            )
+        ).one()
+
+    rows = [
+        (c.id, c.updated_at, c.teacher.updated_at, c.program.updated_at)
+        for c in courses
+    ]
+    timestamps = [ts for row in rows for ts in row[1:]] + [lesson_updated_at]
+    last_modified = max((ts for ts in timestamps if ts), default=None)
+    # 虚拟课程的默认窗口从今天开始，跨天后展开结果会变
+    return resource_version(
+        last_modified, "courses", rows, lesson_count, date.today(), *parts
+    )
+
+
+@router.get("", response_model=CourseListResponse)
+def list_courses(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    order_by: Literal["id", "updated_at"] = "id",
+    with_total: bool = False,
+    lessons_from: Optional[datetime] = None,
+    lessons_to: Optional[datetime] = None,
+    max_lessons: Optional[int] = Query(None, ge=1),
+    db: Session = Depends(get_read_db),
+):
+    query = (
+        db.query(*COURSE_LIST_COLUMNS)
+        .select_from(Course)
         .filter(Course.is_active == 1)
         .join(Course.teacher)
         .join(Course.program)
-        .options(
-            joinedload(Course.teacher),
-            joinedload(Course.program),
-            joinedload(Course.lessons),
-        )
-        .offset(skip)
-        .limit(limit)
-        .all()
     )
+    page = paginate(query, sort_keys(Course, order_by), limit, cursor, skip, with_total)
+    page["items"] = [course_row(row) for row in page["items"]]
+    version = courses_version(db, page["items"], page["total"])
+    unchanged = not_modified(request, response, version)
+    if unchanged is not None:
+        return unchanged
+
+    # 课时单独一条批量查询，不再 JOIN 到课程列表里
+    lessons = load_lessons(db, page["items"], lessons_from, lessons_to, max_lessons)
+    page["items"] = [
+        course_payload(course, *lessons[course.id]) for course in page["items"]
+    ]
+    return trusted_response(page, response)
+
 
-    return {"items": courses}
+@router.post("/check-conflicts", response_model=ConflictReport)
+def check_conflicts(course: CourseCreate, db: Session = Depends(get_read_db)):
+    # 只检查不写入，排课前先试算
+    starts, ends = expand_request_schedule(course.schedule)
+    conflicts = find_conflicts(db, course.teacher_id, starts, ends)
+    return {"lesson_count": len(starts), "conflicts": conflicts}
 
 
 @router.post("", response_model=CourseResponse, status_code=status.HTTP_201_CREATED)
-def create_course(course: CourseCreate, db: Session = Depends(get_db)):
+def create_course(
+    course: CourseCreate,
+    allow_conflicts: bool = False,
+    db: Session = Depends(get_db),
+):
+    starts, ends = expand_request_schedule(course.schedule)
     try:
+        if not allow_conflicts:
+            lock_teacher(db, course.teacher_id)
+            conflicts = find_conflicts(db, course.teacher_id, starts, ends)
+            if conflicts:
+                raise conflict_error(conflicts)
+
         db_course = Course(
             teacher_id=course.teacher_id,
             program_id=course.program_id,
             schedule=[i.model_dump() for i in course.schedule],
+            virtual_lessons=(
+                VIRTUAL_LESSONS
+                if course.virtual_lessons is None
+                else course.virtual_lessons
+            ),
             is_active=course.is_active,
         )
         db.add(db_course)
-        db.commit()
+        # 先 flush 拿到 course id，课程和课时在同一个事务里提交
+        db.flush()
 
-        for schedule in course.schedule:
-            schedule_dates = generate_schedule(schedule)
-            for date in schedule_dates:
-                db_lesson = Lesson(
-                    course_id=db_course.id,
-                    start_time=date["start"],
-                    end_time=date["end"],
-                )
-                db.add(db_lesson)
-            db.commit()
-            db.refresh(db_course)
-            return db_course
+        if not db_course.virtual_lessons:
+            bulk_insert_lessons(db, db_course.id, starts, ends)
+        db.commit()
+        db.refresh(db_course)
+        return course_with_lessons(db, db_course)
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
 @router.get("/{course_id}", response_model=CourseResponse)
-def get_course(course_id: int, db: Session = Depends(get_db)):
+def get_course(
+    course_id: int,
+    request: Request,
+    response: Response,
+    lessons_from: Optional[datetime] = None,
+    lessons_to: Optional[datetime] = None,
+    db: Session = Depends(get_read_db),
+):
     course = (
         db.query(Course)
         .join(Course.teacher)
@@ -180,7 +520,6 @@ def get_course(course_id: int, db: Session = Depends(get_db)):
         .options(
             joinedload(Course.teacher),
             joinedload(Course.program),
-            joinedload(Course.lessons),
         )
         .filter(Course.id == course_id)
         .first()
@@ -189,7 +528,13 @@ def get_course(course_id: int, db: Session = Depends(get_db)):
     if not course:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="课程未找到")
 
-    return course
+    unchanged = not_modified(request, response, courses_version(db, [course]))
+    if unchanged is not None:
+        return unchanged
+
+    return trusted_response(
+        course_with_lessons(db, course, lessons_from, lessons_to), response
+    )
 
 
 @router.put("/{course_id}", response_model=CourseResponse)
@@ -205,7 +550,7 @@ def update_course(
 
     db.commit()
     db.refresh(db_course)
-    return db_course
+    return course_with_lessons(db, db_course)
 
 
 @router.delete("/{course_id}")
@@ -220,14 +565,49 @@ def delete_course(course_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/course/{course_id}/lessons", response_model=ResponseLessonList)
-def get_lessons(course_id: int, db: Session = Depends(get_db)):
-    lessons = (
+def get_lessons(
+    course_id: int,
+    request: Request,
+    response: Response,
+    lessons_from: Optional[datetime] = None,
+    lessons_to: Optional[datetime] = None,
+    db: Session = Depends(get_read_db),
+):
+    course = (
+        db.query(Course)
+        .options(joinedload(Course.teacher), joinedload(Course.program))
+        .filter(Course.id == course_id)
+        .first()
+    )
+    if not course:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="课程未找到")
+
+    unchanged = not_modified(request, response, courses_version(db, [course]))
+    if unchanged is not None:
+        return unchanged
+
+    lessons, _ = load_lessons(db, [course], lessons_from, lessons_to)[course.id]
+    lessons.reverse()
+    return trusted_response({"items": lessons}, response)
+
+
+def upsert_lesson(
+    db: Session, course_id: int, lesson: LessonBase, is_cancelled: bool
+) -> Lesson:
+    # 虚拟课程的课时按 start_time 落库，重复调用返回同一行
+    db_lesson = (
         db.query(Lesson)
-        .filter(Lesson.course_id == course_id)
-        .order_by(Lesson.start_time.desc())
-        .all()
+        .filter(Lesson.course_id == course_id, Lesson.start_time == lesson.start_time)
+        .first()
     )
-    return lessons
+    if db_lesson is None:
+        db_lesson = Lesson(course_id=course_id, **lesson.model_dump())
+        db.add(db_lesson)
+    db_lesson.end_time = lesson.end_time
+    db_lesson.is_cancelled = is_cancelled
+    db.commit()
+    db.refresh(db_lesson)
+    return db_lesson
 
 
 @router.post(
@@ -235,14 +615,56 @@ def get_lessons(course_id: int, db: Session = Depends(get_db)):
     response_model=LessonResponse,
     status_code=status.HTTP_201_CREATED,
 )
-def create_lesson(course_id: int, lesson: LessonCreate, db: Session = Depends(get_db)):
-    db_lesson = Lesson(**lesson.dict())
+def create_lesson(
+    course_id: int,
+    lesson: LessonCreate,
+    allow_conflicts: bool = False,
+    db: Session = Depends(get_db),
+):
+    course = db.query(Course).filter(Course.id == course_id).first()
+    if not course:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="课程未找到")
+
+    if not allow_conflicts:
+        lock_teacher(db, course.teacher_id)
+        conflicts = find_conflicts(
+            db,
+            course.teacher_id,
+            np.array([lesson.start_time], dtype="datetime64[s]"),
+            np.array([lesson.end_time], dtype="datetime64[s]"),
+        )
+        if course.virtual_lessons:
+            # 同一时间的虚拟课时会被这条记录覆盖，不算冲突
+            conflicts = [
+                i
+                for i in conflicts
+                if i["conflicts_with"]["course_id"] != course_id
+                or i["conflicts_with"]["start_time"] != lesson.start_time
+            ]
+        if conflicts:
+            db.rollback()
+            raise conflict_error(conflicts)
+
+    if course.virtual_lessons:
+        return upsert_lesson(db, course_id, lesson, is_cancelled=False)
+
+    db_lesson = Lesson(course_id=course_id, **lesson.model_dump())
     db.add(db_lesson)
     db.commit()
     db.refresh(db_lesson)
     return db_lesson
 
 
+# 取消虚拟课程中的某一节课（落一条取消记录）
+@router.post("/course/{course_id}/lessons/cancel", response_model=LessonResponse)
+def cancel_lesson(course_id: int, lesson: LessonCreate, db: Session = Depends(get_db)):
+    course = db.query(Course).filter(Course.id == course_id).first()
+    if not course or not course.virtual_lessons:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="课程未找到")
+
+    return upsert_lesson(db, course_id, lesson, is_cancelled=True)
+
+
 @router.delete("/course/{course_id}/lesson/{lesson_id}")
 def delete_lesson(course_id: int, lesson_id: int, db: Session = Depends(get_db)):
     db_lesson = (
@@ -253,6 +675,10 @@ def delete_lesson(course_id: int, lesson_id: int, db: Session = Depends(get_db))
     if not db_lesson:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="课程未找到")
 
-    db.delete(db_lesson)
+    if db_lesson.course.virtual_lessons:
+        # 删除会让规则重新展开出这节课，改为标记取消
+        db_lesson.is_cancelled = True
+    else:
+        db.delete(db_lesson)
     db.commit()
     return {"success": True}
@@ -0,0 +1,50 @@
+import time
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from loguru import logger
+from sqlalchemy import text
+
+from app.models import async_engine, engine, replica_engines
+from app.models.pool import pool_stats
+from app.utils.cache import cache_stats
+from app.utils.jwt_utils import auth_cache_stats, get_current_user
+
+router = APIRouter()
+
+
+@router.get("/health")
+def health():
+    start = time.perf_counter()
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except Exception as e:
+        # 健康检查不需要登录，驱动的错误信息只写日志
+        logger.error(f"health check failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="数据库不可用"
+        ) from e
+    return {
+        "status": "ok",
+        "db_latency_ms": (time.perf_counter() - start) * 1000,
+        "pool": pool_stats(engine),
+    }
+
+
+@router.get("/pool")
+def get_pool_stats(current_user: dict = Depends(get_current_user)):
+    return {
+        "sync": pool_stats(engine),
+        "async": pool_stats(async_engine.sync_engine),
+        "replicas": [pool_stats(replica) for replica in replica_engines],
+    }
+
+
+@router.get("/auth-cache")
+def get_auth_cache_stats(current_user: dict = Depends(get_current_user)):
+    return auth_cache_stats()
+
+
+@router.get("/cache")
+def get_cache_stats(current_user: dict = Depends(get_current_user)):
+    return cache_stats()
@@ -0,0 +1,151 @@
+import os
+from typing import List
+
+from fastapi import APIRouter, Depends
+from pydantic import BaseModel
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models import get_db
+from app.models.models import EnrollmentRequest, Lesson, StudentLesson
+from app.utils.jwt_utils import get_current_user
+
+router = APIRouter()
+
+# 每个事务处理的申请数；同一批的课时在一条多行 INSERT 里写入
+ENROLLMENT_CHUNK_SIZE = int(os.getenv("ENROLLMENT_CHUNK_SIZE") or 500)
+
+
+class EnrollmentBatch(BaseModel):
+    request_ids: List[int]
+
+
+class EnrollmentBatchResponse(BaseModel):
+    processed: List[int]
+    # 不存在或已经处理过的申请，重试时会落在这里
+    skipped: List[int]
+    enrolled: int = 0
+    reactivated: int = 0
+
+
+def lock_pending(db: Session, request_ids: List[int]) -> List[EnrollmentRequest]:
+    # 锁住待处理的申请，并发的重复审批会等这一批提交后看到新状态
+    return list(
+        db.scalars(
+            select(EnrollmentRequest)
+            .where(
+                EnrollmentRequest.id.in_(request_ids),
+                EnrollmentRequest.status == "pending",
+            )
+            .with_for_update()
+        )
+    )
+
+
+def requested_pairs(db: Session, requests: List[EnrollmentRequest]) -> set:
+    # lesson_ids 为空表示整门课；指定的课时也必须属于申请的课程
+    course_ids = {r.course_id for r in requests}
+    lessons_by_course = {}
+    for lesson_id, course_id in db.execute(
+        select(Lesson.id, Lesson.course_id).where(
+            Lesson.course_id.in_(course_ids), Lesson.is_cancelled.is_(False)
+        )
+    ):
+        lessons_by_course.setdefault(course_id, set()).add(lesson_id)
+
+    pairs = set()
+    for r in requests:
+        lessons = lessons_by_course.get(r.course_id, set())
+        if r.lesson_ids:
+            lessons = lessons & {int(i) for i in r.lesson_ids}
+        pairs.update((r.student_id, lesson_id) for lesson_id in lessons)
+    return pairs
+
+
+def enroll(db: Session, pairs: set):
+    if not pairs:
+        return 0, 0
+    # 按学生、课时两个集合查出已有记录，走 (student_id, lesson_id) 索引
+    existing = {
+        (student_id, lesson_id): student_lesson_id
+        for student_id, lesson_id, student_lesson_id in db.execute(
+            select(
+                StudentLesson.student_id, StudentLesson.lesson_id, StudentLesson.id
+            ).where(
+                StudentLesson.student_id.in_({pair[0] for pair in pairs}),
+                StudentLesson.lesson_id.in_({pair[1] for pair in pairs}),
+            )
+        )
+    }
+    new_rows = [
+        {"student_id": student_id, "lesson_id": lesson_id, "is_active": True}
+        for student_id, lesson_id in sorted(pairs - existing.keys())
+    ]
+    if new_rows:
+        db.execute(insert(StudentLesson), new_rows)
+
+    # 之前退过课的记录重新启用，不再插一行
+    reactivated = db.execute(
+        update(StudentLesson)
+        .where(
+            StudentLesson.id.in_([existing[p] for p in pairs & existing.keys()]),
+            StudentLesson.is_active.is_not(True),
+        )
+        .values(is_active=True)
+    ).rowcount
+    return len(new_rows), reactivated
+
+
+def set_status(db: Session, request_ids: List[int], status: str):
+    db.execute(
+        update(EnrollmentRequest)
+        .where(
+            EnrollmentRequest.id.in_(request_ids),
+            EnrollmentRequest.status == "pending",
+        )
+        .values(status=status)
+    )
+
+
+@router.post("/approve", response_model=EnrollmentBatchResponse)
+def approve_enrollments(
+    batch: EnrollmentBatch,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    request_ids = list(dict.fromkeys(batch.request_ids))
+    result = {"processed": [], "skipped": [], "enrolled": 0, "reactivated": 0}
+    for i in range(0, len(request_ids), ENROLLMENT_CHUNK_SIZE):
+        chunk = request_ids[i : i + ENROLLMENT_CHUNK_SIZE]
+        try:
+            requests = lock_pending(db, chunk)
+            enrolled, reactivated = enroll(db, requested_pairs(db, requests))
+            approved = [r.id for r in requests]
+            set_status(db, approved, "approved")
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        result["processed"].extend(approved)
+        result["skipped"].extend(sorted(set(chunk) - set(approved)))
+        result["enrolled"] += enrolled
+        result["reactivated"] += reactivated
+    return result
+
+
+@router.post("/reject", response_model=EnrollmentBatchResponse)
+def reject_enrollments(
+    batch: EnrollmentBatch,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    request_ids = list(dict.fromkeys(batch.request_ids))
+    result = {"processed": [], "skipped": []}
+    for i in range(0, len(request_ids), ENROLLMENT_CHUNK_SIZE):
+        chunk = request_ids[i : i + ENROLLMENT_CHUNK_SIZE]
+        rejected = [r.id for r in lock_pending(db, chunk)]
+        set_status(db, rejected, "rejected")
+        db.commit()
+        result["processed"].extend(rejected)
+        result["skipped"].extend(sorted(set(chunk) - set(rejected)))
+    return result
@@ -0,0 +1,148 @@
+import csv
+import io
+import os
+import tempfile
+from datetime import datetime
+from typing import Iterator, Literal
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import ReadSessionLocal
+from app.models.models import EmailLog, Lesson, Student, StudentLesson
+from app.utils.jwt_utils import get_current_user
+from app.utils.responses import json_line
+
+router = APIRouter()
+
+# 每批从服务端游标取的行数，也是写 CSV/XLSX 的块大小
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE") or 2000)
+# XLSX 单个工作表最多 1048576 行，去掉表头后的数据行数
+XLSX_MAX_ROWS = 1048575
+# 生成好的 XLSX 文件按块读出
+XLSX_READ_SIZE = 64 * 1024
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def export_query(dataset: str):
+    if dataset == "students":
+        return select(*Student.__table__.columns).order_by(Student.id)
+    if dataset == "lessons":
+        return select(*Lesson.__table__.columns).order_by(Lesson.id)
+    if dataset == "enrollments":
+        return (
+            select(
+                StudentLesson.id,
+                StudentLesson.student_id,
+                Student.name.label("student_name"),
+                Student.email.label("student_email"),
+                StudentLesson.lesson_id,
+                Lesson.course_id,
+                Lesson.start_time,
+                Lesson.end_time,
+                StudentLesson.is_active,
+            )
+            .join(Student, Student.id == StudentLesson.student_id)
+            .join(Lesson, Lesson.id == StudentLesson.lesson_id)
+            .order_by(StudentLesson.id)
+        )
+    return select(*EmailLog.__table__.columns).order_by(EmailLog.id)
+
+
+def export_columns(dataset: str) -> list:
+    return [column.key for column in export_query(dataset).selected_columns]
+
+
+def export_batches(dataset: str) -> Iterator[list]:
+    # 依赖注入的 session 在响应开始前就会关闭，生成器里自己开 session；
+    # yield_per 打开服务端游标，内存里同时只有一批行
+    db: Session = ReadSessionLocal()
+    try:
+        result = db.execute(
+            export_query(dataset).execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        yield from result.partitions()
+    finally:
+        db.close()
+
+
+def stream_csv(dataset: str) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # 带 BOM，Excel 直接打开中文不乱码
+    buffer.write("\ufeff")
+    writer.writerow(export_columns(dataset))
+    for rows in export_batches(dataset):
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def stream_ndjson(dataset: str) -> Iterator[bytes]:
+    columns = export_columns(dataset)
+    for rows in export_batches(dataset):
+        yield b"".join(json_line(dict(zip(columns, row))) for row in rows)
+
+
+def stream_xlsx(dataset: str) -> Iterator[bytes]:
+    import xlsxwriter
+
+    # xlsx 是 zip 包，写完才能发出。constant_memory 模式下每写完一行就落盘，
+    # 内存与总行数无关，但要求严格按行顺序写入
+    columns = export_columns(dataset)
+    with tempfile.TemporaryFile() as f:
+        workbook = xlsxwriter.Workbook(
+            f,
+            {
+                "constant_memory": True,
+                "tmpdir": tempfile.gettempdir(),
+                "default_date_format": "yyyy-mm-dd hh:mm:ss",
+            },
+        )
+
+        def add_sheet(n: int):
+            worksheet = workbook.add_worksheet(dataset if n == 1 else f"{dataset}_{n}")
+            worksheet.write_row(0, 0, columns)
+            return worksheet
+
+        sheet = 1
+        worksheet, row = add_sheet(sheet), 1
+        for rows in export_batches(dataset):
+            for values in rows:
+                if row > XLSX_MAX_ROWS:
+                    sheet += 1
+                    worksheet, row = add_sheet(sheet), 1
+                worksheet.write_row(row, 0, values)
+                row += 1
+        workbook.close()
+
+        f.seek(0)
+        while chunk := f.read(XLSX_READ_SIZE):
+            yield chunk
+
+
+STREAMS = {"csv": stream_csv, "ndjson": stream_ndjson, "xlsx": stream_xlsx}
+
+
+@router.get("/{dataset}")
+def export_dataset(
+    dataset: Literal["students", "lessons", "enrollments", "email_logs"],
+    format: Literal["csv", "ndjson", "xlsx"] = "csv",
+    current_user: dict = Depends(get_current_user),
+):
+    filename = f"{dataset}_{datetime.now():%Y%m%d%H%M%S}.{format}"
+    return StreamingResponse(
+        STREAMS[format](dataset),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,307 @@
+import io
+import os
+from datetime import datetime
+from typing import List, Literal, Optional
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    File,
+    HTTPException,
+    Response,
+    UploadFile,
+    status,
+)
+from pydantic import BaseModel
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.models import SessionLocal
+from app.models.models import Student, Teacher
+from app.routes.teacher import teacher_cache
+from app.utils.cache import get_backend
+from app.utils.jwt_utils import get_current_user
+from app.utils.unique_id import get_id
+
+router = APIRouter()
+
+# 每条 upsert 语句写入的行数，每批单独提交并更新进度
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE") or 1000)
+# 超过这个行数转为后台任务，客户端轮询进度
+IMPORT_SYNC_MAX_ROWS = int(os.getenv("IMPORT_SYNC_MAX_ROWS") or 2000)
+IMPORT_MAX_BYTES = int(os.getenv("IMPORT_MAX_BYTES") or 20 * 1024 * 1024)
+# 任务状态的保留时间（秒），到期后查询返回 404
+IMPORT_JOB_TTL = float(os.getenv("IMPORT_JOB_TTL") or 24 * 3600)
+
+EMAIL_PATTERN = r"^[^@\s]+@[^@\s]+\.[^@\s]+$"
+
+COLUMNS = {
+    "students": {"required": ["email", "name"], "optional": ["age", "sex", "phone"]},
+    "teachers": {"required": ["name", "email", "phone"], "optional": ["comment"]},
+}
+
+
+class ImportRowError(BaseModel):
+    row: int
+    field: Optional[str] = None
+    message: str
+
+
+class ImportJobResponse(BaseModel):
+    id: str
+    kind: str
+    status: Literal["pending", "running", "done", "failed"]
+    total: int
+    processed: int = 0
+    inserted: int = 0
+    updated: int = 0
+    errors: List[ImportRowError] = []
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+
+def job_key(job_id: str) -> str:
+    return f"imports:job:{job_id}"
+
+
+def save_job(job: dict):
+    # 存进缓存后端：CACHE_BACKEND=redis 时任何 worker 都能查到进度
+    get_backend().set(job_key(job["id"]), job, ttl=IMPORT_JOB_TTL)
+
+
+def new_job(kind: str, total: int, errors: List[dict]) -> dict:
+    job = {
+        "id": get_id(12),
+        "kind": kind,
+        "status": "pending",
+        "total": total,
+        "processed": 0,
+        "inserted": 0,
+        "updated": 0,
+        "errors": errors,
+        "created_at": datetime.now(),
+        "finished_at": None,
+    }
+    save_job(job)
+    return job
+
+
+def read_upload(file: UploadFile):
+    import pandas as pd
+
+    content = file.file.read(IMPORT_MAX_BYTES + 1)
+    if len(content) > IMPORT_MAX_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="文件过大"
+        )
+    name = (file.filename or "").lower()
+    try:
+        # 全部按字符串读入，类型转换放到校验里统一做
+        if name.endswith((".xlsx", ".xls")):
+            df = pd.read_excel(io.BytesIO(content), dtype=str, keep_default_na=False)
+        else:
+            df = pd.read_csv(
+                io.BytesIO(content),
+                dtype=str,
+                keep_default_na=False,
+                encoding="utf-8-sig",
+            )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"无法解析文件: {e}"
+        ) from e
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    return df
+
+
+def validate(kind: str, df):
+    """Vectorized validation; returns the clean rows and per-row errors.
+
+    Row numbers in errors are spreadsheet lines (the header is line 1).
+    """
+    import pandas as pd
+
+    spec = COLUMNS[kind]
+    missing = [c for c in spec["required"] if c not in df.columns]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"缺少列: {', '.join(missing)}",
+        )
+    df = df[[c for c in spec["required"] + spec["optional"] if c in df.columns]]
+    df = df.apply(lambda column: column.str.strip())
+    df["email"] = df["email"].str.lower()
+
+    checks = [(df[c] == "", c, "不能为空") for c in spec["required"]]
+    checks.append(
+        (
+            (df["email"] != "") & ~df["email"].str.match(EMAIL_PATTERN),
+            "email",
+            "邮箱格式不正确",
+        )
+    )
+    if "phone" in df.columns:
+        checks.append((df["phone"].str.len() > 20, "phone", "电话号码过长"))
+    if "age" in df.columns:
+        age = pd.to_numeric(df["age"], errors="coerce")
+        checks.append(
+            (
+                (df["age"] != "") & (age.isna() | (age < 0) | (age > 150)),
+                "age",
+                "年龄无效",
+            )
+        )
+        df["age"] = age.astype("Int64")
+    if "sex" in df.columns:
+        df["sex"] = df["sex"].replace("", "Other")
+        checks.append(
+            (~df["sex"].isin(["M", "F", "Other"]), "sex", "性别只能是 M/F/Other")
+        )
+
+    invalid = pd.Series(False, index=df.index)
+    for mask, _, _ in checks:
+        invalid |= mask
+    # 重复只在其余校验都通过的行之间判断，无效的后一行不能顶掉有效的前一行
+    key = "email" if kind == "students" else "name"
+    duplicated = (
+        df.loc[~invalid, key]
+        .duplicated(keep="last")
+        .reindex(df.index, fill_value=False)
+    )
+    checks.append((duplicated, key, "文件内重复，以最后一行为准"))
+    invalid |= duplicated
+
+    errors = []
+    for mask, field, message in checks:
+        errors.extend(
+            {"row": int(i) + 2, "field": field, "message": message}
+            for i in df.index[mask]
+        )
+    errors.sort(key=lambda e: e["row"])
+
+    valid = df[~invalid].astype(object)
+    # 可选列的空字符串写成 NULL
+    valid = valid.where((valid != "") & valid.notna(), None)
+    rows = [
+        (int(i) + 2, record) for i, record in zip(valid.index, valid.to_dict("records"))
+    ]
+    return rows, errors
+
+
+def upsert_students(db: Session, rows: List[dict]):
+    now = datetime.now()
+    existing = set(
+        db.scalars(
+            select(Student.email).where(Student.email.in_([r["email"] for r in rows]))
+        )
+    )
+    values = [dict(r, created_at=now, updated_at=now) for r in rows]
+    columns = [c for c in rows[0] if c != "email"] + ["updated_at"]
+    if db.get_bind().dialect.name == "mysql":
+        stmt = mysql_insert(Student).values(values)
+        stmt = stmt.on_duplicate_key_update({c: stmt.inserted[c] for c in columns})
+    else:
+        stmt = sqlite_insert(Student).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Student.email], set_={c: stmt.excluded[c] for c in columns}
+        )
+    db.execute(stmt)
+    return len(rows) - len(existing), list(existing)
+
+
+def upsert_teachers(db: Session, rows: List[dict]):
+    # 教师没有唯一键，和 create_teacher 一样按姓名认定同一个人
+    now = datetime.now()
+    existing = dict(
+        db.execute(
+            select(Teacher.name, Teacher.id).where(
+                Teacher.name.in_([r["name"] for r in rows])
+            )
+        ).all()
+    )
+    updates = [
+        dict(r, id=existing[r["name"]], updated_at=now)
+        for r in rows
+        if r["name"] in existing
+    ]
+    inserts = [
+        dict(r, created_at=now, updated_at=now)
+        for r in rows
+        if r["name"] not in existing
+    ]
+    if updates:
+        db.execute(update(Teacher), updates)
+    if inserts:
+        db.execute(insert(Teacher), inserts)
+    return len(inserts), [r["id"] for r in updates]
+
+
+UPSERTS = {"students": upsert_students, "teachers": upsert_teachers}
+
+
+def run_import(job: dict, rows: List[tuple]):
+    job["status"] = "running"
+    save_job(job)
+    db = SessionLocal()
+    try:
+        for i in range(0, len(rows), IMPORT_BATCH_SIZE):
+            batch = rows[i : i + IMPORT_BATCH_SIZE]
+            try:
+                inserted, updated = UPSERTS[job["kind"]](db, [r for _, r in batch])
+                db.commit()
+                job["inserted"] += inserted
+                job["updated"] += len(updated)
+                if job["kind"] == "teachers" and (inserted or updated):
+                    # 只让本批改到的教师和列表失效
+                    teacher_cache.invalidate(*updated)
+            except SQLAlchemyError as e:
+                db.rollback()
+                job["errors"].extend(
+                    {"row": line, "field": None, "message": str(e.orig or e)}
+                    for line, _ in batch
+                )
+            job["processed"] += len(batch)
+            save_job(job)
+        job["status"] = "done"
+    except Exception as e:
+        job["status"] = "failed"
+        job["errors"].append({"row": 0, "field": None, "message": str(e)})
+    finally:
+        db.close()
+        job["finished_at"] = datetime.now()
+        save_job(job)
+
+
+@router.post("/{kind}", response_model=ImportJobResponse)
+def import_file(
+    kind: Literal["students", "teachers"],
+    response: Response,
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    current_user: dict = Depends(get_current_user),
+):
+    df = read_upload(file)
+    rows, errors = validate(kind, df)
+    job = new_job(kind, len(df), errors)
+    # 校验失败的行也算已处理
+    job["processed"] = len(df) - len(rows)
+
+    if len(rows) > IMPORT_SYNC_MAX_ROWS:
+        background_tasks.add_task(run_import, job, rows)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return job
+
+    run_import(job, rows)
+    return job
+
+
+@router.get("/jobs/{job_id}", response_model=ImportJobResponse)
+def get_import_job(job_id: str, current_user: dict = Depends(get_current_user)):
+    job = get_backend().get(job_key(job_id))
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="任务未找到")
+    return job
@@ -0,0 +1,47 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.models import async_engine, engine, replica_engines
+from app.models.pool import pool_stats
+from app.utils.metrics import metric_lines, registry
+
+router = APIRouter()
+
+# pool_stats 里导出为 gauge 的字段
+POOL_GAUGES = ("size", "checked_in", "in_use", "overflow")
+POOL_COUNTERS = ("checkouts", "timeouts", "overflow_connects", "connects")
+
+
+def pool_lines() -> list:
+    pools = [
+        ("primary", pool_stats(engine)),
+        ("async", pool_stats(async_engine.sync_engine)),
+        *((f"replica{i}", pool_stats(e)) for i, e in enumerate(replica_engines)),
+    ]
+    # SQLite 等未做统计的连接池没有这些字段
+    pools = [(name, stats) for name, stats in pools if "checkouts" in stats]
+    lines = []
+    for field in POOL_GAUGES:
+        lines += metric_lines(
+            f"db_pool_{field}",
+            "gauge",
+            f"Connection pool {field.replace('_', ' ')}.",
+            (({"pool": name}, stats[field]) for name, stats in pools),
+        )
+    for field in POOL_COUNTERS:
+        lines += metric_lines(
+            f"db_pool_{field}_total",
+            "counter",
+            f"Connection pool {field.replace('_', ' ')}.",
+            (({"pool": name}, stats[field]) for name, stats in pools),
+        )
+    return lines
+
+
+# Prometheus 抓取用，和 /diagnostics/health 一样不需要登录
+@router.get("/metrics", include_in_schema=False)
+def get_metrics():
+    lines = registry.render() + pool_lines()
+    return PlainTextResponse(
+        "\n".join(lines) + "\n", media_type="text/plain; version=0.0.4"
+    )
@@ -1,21 +1,26 @@
-from typing import List, Optional
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from pydantic import BaseModel, ConfigDict
 from sqlalchemy.orm import Session
 
 from app.models import get_db
 from app.models.models import Program
+from app.utils.cache import ReadThroughCache
+from app.utils.etag import collection_version, item_version, not_modified
 from app.utils.jwt_utils import get_current_user
+from app.utils.pagination import paginate, sort_keys
 
 router = APIRouter()
 
+program_cache = ReadThroughCache("programs")
+
 
 class ProgramBase(BaseModel):
     category: str
     name: str
-    description: str = None
-    comment: str = None
+    description: Optional[str] = None
+    comment: Optional[str] = None
     is_active: Optional[bool] = True
 
 
@@ -26,12 +31,19 @@ class ProgramCreate(ProgramBase):
 class ProgramResponse(ProgramBase):
     id: int
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ResponseProgramList(BaseModel):
     items: List[ProgramResponse]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+
+def program_to_dict(db_program: Program) -> dict:
+    # 缓存里只放可序列化的数据，方便换成共享存储
+    response = ProgramResponse.model_validate(db_program, from_attributes=True)
+    return response.model_dump(mode="json")
 
 
 # 创建课程教师
@@ -43,9 +55,7 @@ def create_program(
 ):
     existing = (
         db.query(Program)
-        .filter(
-            Program.category == program.category, Program.name == program.name
-        )
+        .filter(Program.category == program.category, Program.name == program.name)
         .first()
     )
     if existing:
@@ -57,6 +67,7 @@ def create_program(
     db.add(db_program)
     db.commit()
     db.refresh(db_program)
+    program_cache.invalidate()
     return db_program
 
 
@@ -64,10 +75,25 @@ def create_program(
 @router.get("/{program_id}", response_model=ProgramResponse)
 def get_program(
     program_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user),
 ):
-    program = db.query(Program).filter(Program.id == program_id).first()
+    version = program_cache.get_or_load(
+        program_cache.item_key(program_id, "version"),
+        lambda: item_version(db, Program, program_id),
+    )
+    unchanged = not_modified(request, response, version)
+    if unchanged is not None:
+        return unchanged
+
+    def load():
+        program = db.query(Program).filter(Program.id == program_id).first()
+        if program:
+            return program_to_dict(program)
+
+    program = program_cache.get_or_load(program_cache.item_key(program_id), load)
     if not program:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Program not found"
@@ -78,21 +104,36 @@ def get_program(
 # 获取课程教师列表
 @router.get("", response_model=ResponseProgramList)
 def list_programs(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    order_by: Literal["id", "updated_at"] = "id",
+    with_total: bool = False,
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user),
 ):
-    programs = (
-        db.query(Program)
-        .filter(Program.is_active == 1)
-        .offset(skip)
-        .limit(limit)
-        .all()
+    version = program_cache.get_or_load(
+        program_cache.list_key(version=True),
+        lambda: collection_version(db, Program, Program.is_active == 1),
     )
-    return {
-        "items": programs,
-    }
+    unchanged = not_modified(request, response, version)
+    if unchanged is not None:
+        return unchanged
+
+    def load():
+        query = db.query(Program).filter(Program.is_active == 1)
+        page = paginate(
+            query, sort_keys(Program, order_by), limit, cursor, skip, with_total
+        )
+        page["items"] = [program_to_dict(i) for i in page["items"]]
+        return page
+
+    key = program_cache.list_key(
+        skip=skip, limit=limit, cursor=cursor, order_by=order_by, with_total=with_total
+    )
+    return program_cache.get_or_load(key, load)
 
 
 # 更新课程教师
@@ -103,9 +144,7 @@ def update_program(
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user),
 ):
-    db_program = (
-        db.query(Program).filter(Program.id == program_id).first()
-    )
+    db_program = db.query(Program).filter(Program.id == program_id).first()
     if not db_program:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Program not found"
@@ -116,6 +155,7 @@ def update_program(
 
     db.commit()
     db.refresh(db_program)
+    program_cache.invalidate(program_id)
     return db_program
 
 
@@ -126,9 +166,7 @@ def delete_program(
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user),
 ):
-    db_program = (
-        db.query(Program).filter(Program.id == program_id).first()
-    )
+    db_program = db.query(Program).filter(Program.id == program_id).first()
     if not db_program:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Program not found"
@@ -136,6 +174,7 @@ def delete_program(
 
     db_program.is_active = False
     db.commit()
+    program_cache.invalidate(program_id)
     return {
         "success": True,
     }
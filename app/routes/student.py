@@ -1,12 +1,26 @@
 from datetime import datetime
-from typing import List
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import literal, select, union_all
 from sqlalchemy.orm import Session
 
-from app.models import get_db
-from app.models.models import Student, StudentLesson
+from app.models import get_db, get_read_db
+from app.models.models import (
+    Course,
+    LeaveRequest,
+    Lesson,
+    Program,
+    Student,
+    StudentLesson,
+    Teacher,
+    WithdrawRequest,
+)
+from app.routes.course import ProgramResponse, TeacherResponse, virtual_window
+from app.utils.etag import item_version, not_modified, page_version
+from app.utils.pagination import paginate, sort_keys
+from app.utils.responses import trusted_response
 
 router = APIRouter()
 
@@ -32,8 +46,13 @@ class StudentResponse(StudentBase):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ResponseStudentList(BaseModel):
+    items: List[StudentResponse]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
 
 
 class StudentLessonBase(BaseModel):
@@ -44,11 +63,8 @@ class StudentLessonBase(BaseModel):
 
 class StudentLessonResponse(StudentLessonBase):
     id: int
-    created_at: datetime
-    updated_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ResponseStudentLessonList(BaseModel):
@@ -59,10 +75,47 @@ class StudentLessonCreate(StudentLessonBase):
     pass
 
 
-@router.get("", response_model=ResponseStudentLessonList)
-def list_students(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    students = db.query(Student).offset(skip).limit(limit).all()
-    return {"items": students}
+class TimetableLesson(BaseModel):
+    id: int
+    student_lesson_id: int
+    start_time: datetime
+    end_time: datetime
+    is_cancelled: bool
+    course_id: int
+    teacher: TeacherResponse
+    program: ProgramResponse
+    leave_status: Optional[Literal["pending", "approved"]] = None
+    withdraw_status: Optional[Literal["pending"]] = None
+
+
+class ResponseTimetable(BaseModel):
+    items: List[TimetableLesson]
+
+
+@router.get("", response_model=ResponseStudentList)
+def list_students(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    order_by: Literal["id", "updated_at"] = "id",
+    with_total: bool = False,
+    db: Session = Depends(get_read_db),
+):
+    page = paginate(
+        db.query(Student),
+        sort_keys(Student, order_by),
+        limit,
+        cursor,
+        skip,
+        with_total,
+    )
+    version = page_version(Student, page["items"], page["total"])
+    unchanged = not_modified(request, response, version)
+    if unchanged is not None:
+        return unchanged
+    return page
 
 
 @router.post("", response_model=StudentResponse, status_code=status.HTTP_201_CREATED)
@@ -75,7 +128,17 @@ def create_student(student: StudentCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/{student_id}", response_model=StudentResponse)
-def get_student(student_id: int, db: Session = Depends(get_db)):
+def get_student(
+    student_id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+):
+    version = item_version(db, Student, student_id)
+    unchanged = not_modified(request, response, version)
+    if unchanged is not None:
+        return unchanged
+
     student = db.query(Student).filter(Student.id == student_id).first()
     if not student:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="学生未找到")
@@ -110,14 +173,110 @@ def delete_student(student_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/{student_id}/lessons", response_model=ResponseStudentLessonList)
-def get_lessons(student_id: int, db: Session = Depends(get_db)):
+def get_lessons(student_id: int, db: Session = Depends(get_read_db)):
     lessons = (
         db.query(StudentLesson)
         .filter(StudentLesson.student_id == student_id)
-        .order_by(StudentLesson.created_at.desc())
+        .order_by(StudentLesson.id.desc())
         .all()
     )
-    return lessons
+    return {"items": lessons}
+
+
+def request_states(db: Session, student_id: int, lesson_ids: List[int]) -> dict:
+    # 请假和退课申请合成一条 UNION ALL，驳回的不影响课表
+    active = ("pending", "approved")
+    stmt = union_all(
+        select(
+            literal("leave").label("kind"), LeaveRequest.lesson_id, LeaveRequest.status
+        ).where(
+            LeaveRequest.student_id == student_id,
+            LeaveRequest.lesson_id.in_(lesson_ids),
+            LeaveRequest.status.in_(active),
+        ),
+        select(
+            literal("withdraw").label("kind"),
+            WithdrawRequest.lesson_id,
+            WithdrawRequest.status,
+        ).where(
+            WithdrawRequest.student_id == student_id,
+            WithdrawRequest.lesson_id.in_(lesson_ids),
+            WithdrawRequest.status.in_(active),
+        ),
+    )
+    states = {}
+    for row in db.execute(stmt):
+        state = states.setdefault(row.lesson_id, {})
+        # 同一节课多条申请时，已批准的优先
+        if state.get(row.kind) != "approved":
+            state[row.kind] = row.status
+    return states
+
+
+@router.get("/{student_id}/timetable", response_model=ResponseTimetable)
+def get_timetable(
+    student_id: int,
+    lessons_from: Optional[datetime] = None,
+    lessons_to: Optional[datetime] = None,
+    db: Session = Depends(get_read_db),
+):
+    lessons_from, lessons_to = virtual_window(lessons_from, lessons_to)
+    rows = db.execute(
+        select(
+            StudentLesson.id.label("student_lesson_id"),
+            Lesson.id,
+            Lesson.start_time,
+            Lesson.end_time,
+            Lesson.is_cancelled,
+            Lesson.course_id,
+            Teacher.id.label("teacher_id"),
+            Teacher.name.label("teacher_name"),
+            Program.id.label("program_id"),
+            Program.name.label("program_name"),
+        )
+        .join(Lesson, Lesson.id == StudentLesson.lesson_id)
+        .join(Course, Course.id == Lesson.course_id)
+        .join(Teacher, Teacher.id == Course.teacher_id)
+        .join(Program, Program.id == Course.program_id)
+        .where(
+            StudentLesson.student_id == student_id,
+            StudentLesson.is_active.is_(True),
+            Course.is_active == 1,
+            Lesson.start_time >= lessons_from,
+            Lesson.start_time <= lessons_to,
+        )
+        .order_by(Lesson.start_time, Lesson.id)
+    ).all()
+
+    if not rows:
+        if db.get(Student, student_id) is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="学生未找到"
+            )
+        return {"items": []}
+
+    states = request_states(db, student_id, [row.id for row in rows])
+    items = []
+    for row in rows:
+        state = states.get(row.id, {})
+        # 退课已批准的课时不再出现在课表里
+        if state.get("withdraw") == "approved":
+            continue
+        items.append(
+            {
+                "id": row.id,
+                "student_lesson_id": row.student_lesson_id,
+                "start_time": row.start_time,
+                "end_time": row.end_time,
+                "is_cancelled": row.is_cancelled,
+                "course_id": row.course_id,
+                "teacher": {"id": row.teacher_id, "name": row.teacher_name},
+                "program": {"id": row.program_id, "name": row.program_name},
+                "leave_status": state.get("leave"),
+                "withdraw_status": state.get("withdraw"),
+            }
+        )
+    return trusted_response({"items": items})
 
 
 @router.post(
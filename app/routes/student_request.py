@@ -0,0 +1,180 @@
+import os
+from datetime import datetime
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import exists, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models import get_db, get_read_db
+from app.models.models import (
+    EmailLog,
+    LeaveRequest,
+    Lesson,
+    Student,
+    StudentLesson,
+    WithdrawRequest,
+)
+from app.utils.jwt_utils import get_current_user
+from app.utils.pagination import paginate
+
+router = APIRouter()
+
+# 每个事务处理的申请数
+STUDENT_REQUEST_CHUNK_SIZE = int(os.getenv("STUDENT_REQUEST_CHUNK_SIZE") or 500)
+
+MODELS = {"leave": LeaveRequest, "withdraw": WithdrawRequest}
+
+NOTIFICATIONS = {
+    ("leave", "approved"): "请假申请已批准",
+    ("leave", "rejected"): "请假申请未通过",
+    ("withdraw", "approved"): "退课申请已批准",
+    ("withdraw", "rejected"): "退课申请未通过",
+}
+
+
+class StudentRequestResponse(BaseModel):
+    id: int
+    student_id: int
+    lesson_id: int
+    leave_date: Optional[datetime] = None
+    status: Literal["pending", "approved", "rejected"]
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ResponseStudentRequestList(BaseModel):
+    items: List[StudentRequestResponse]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+
+class StudentRequestDecision(BaseModel):
+    request_ids: List[int]
+    status: Literal["approved", "rejected"]
+    notify: bool = True
+
+
+class StudentRequestDecisionResponse(BaseModel):
+    processed: List[int]
+    # 不存在或已经处理过的申请
+    skipped: List[int]
+    deactivated: int = 0
+    notified: int = 0
+
+
+def deactivate_withdrawn(db: Session, request_ids: List[int]) -> int:
+    # 一条 UPDATE：批准退课的 (student_id, lesson_id) 对应的选课记录全部停用
+    return db.execute(
+        update(StudentLesson)
+        .where(
+            StudentLesson.is_active.is_(True),
+            exists().where(
+                WithdrawRequest.id.in_(request_ids),
+                WithdrawRequest.student_id == StudentLesson.student_id,
+                WithdrawRequest.lesson_id == StudentLesson.lesson_id,
+            ),
+        )
+        .values(is_active=False)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+def queue_notifications(
+    db: Session, kind: str, status: str, request_ids: List[int]
+) -> int:
+    model = MODELS[kind]
+    subject = NOTIFICATIONS[(kind, status)]
+    rows = db.execute(
+        select(Student.id, Student.email, Student.name, Lesson.start_time)
+        .select_from(model)
+        .join(Student, Student.id == model.student_id)
+        .join(Lesson, Lesson.id == model.lesson_id)
+        .where(model.id.in_(request_ids))
+    ).all()
+    if not rows:
+        return 0
+    now = datetime.now()
+    db.execute(
+        insert(EmailLog),
+        [
+            {
+                "student_id": row.id,
+                "to_email": row.email,
+                "subject": subject,
+                "body": f"{row.name}，您 {row.start_time:%Y-%m-%d %H:%M} 这节课的"
+                f"{subject}。",
+                "status": "pending",
+                "created_at": now,
+            }
+            for row in rows
+        ],
+    )
+    return len(rows)
+
+
+@router.get("/{kind}", response_model=ResponseStudentRequestList)
+def list_student_requests(
+    kind: Literal["leave", "withdraw"],
+    status: Optional[Literal["pending", "approved", "rejected"]] = None,
+    student_id: Optional[int] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    with_total: bool = False,
+    db: Session = Depends(get_read_db),
+    current_user: dict = Depends(get_current_user),
+):
+    model = MODELS[kind]
+    query = db.query(model)
+    if status is not None:
+        query = query.filter(model.status == status)
+    if student_id is not None:
+        query = query.filter(model.student_id == student_id)
+    # (status, created_at) 索引上的 keyset 翻页，最早提交的排在前面
+    keys = [model.status, model.created_at, model.id]
+    return paginate(query, keys, limit, cursor, with_total=with_total)
+
+
+@router.post("/{kind}/decisions", response_model=StudentRequestDecisionResponse)
+def decide_student_requests(
+    kind: Literal["leave", "withdraw"],
+    decision: StudentRequestDecision,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    model = MODELS[kind]
+    request_ids = list(dict.fromkeys(decision.request_ids))
+    result = {"processed": [], "skipped": [], "deactivated": 0, "notified": 0}
+    for i in range(0, len(request_ids), STUDENT_REQUEST_CHUNK_SIZE):
+        chunk = request_ids[i : i + STUDENT_REQUEST_CHUNK_SIZE]
+        # 状态、选课记录和通知邮件在同一个事务里提交
+        try:
+            pending = list(
+                db.scalars(
+                    select(model.id)
+                    .where(model.id.in_(chunk), model.status == "pending")
+                    .with_for_update()
+                )
+            )
+            if pending:
+                db.execute(
+                    update(model)
+                    .where(model.id.in_(pending))
+                    .values(status=decision.status)
+                    .execution_options(synchronize_session=False)
+                )
+                if kind == "withdraw" and decision.status == "approved":
+                    result["deactivated"] += deactivate_withdrawn(db, pending)
+                if decision.notify:
+                    result["notified"] += queue_notifications(
+                        db, kind, decision.status, pending
+                    )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        result["processed"].extend(pending)
+        result["skipped"].extend(sorted(set(chunk) - set(pending)))
+    return result
@@ -1,15 +1,20 @@
-from typing import List, Optional
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from pydantic import BaseModel, ConfigDict
 from sqlalchemy.orm import Session
 
 from app.models import get_db
 from app.models.models import Teacher
+from app.utils.cache import ReadThroughCache
+from app.utils.etag import collection_version, item_version, not_modified
 from app.utils.jwt_utils import get_current_user
+from app.utils.pagination import paginate, sort_keys
 
 router = APIRouter()
 
+teacher_cache = ReadThroughCache("teachers")
+
 
 class TeacherBase(BaseModel):
     name: str
@@ -26,12 +31,19 @@ class TeacherCreate(TeacherBase):
 class TeacherResponse(TeacherBase):
     id: int
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ResponseTeacherList(BaseModel):
     items: List[TeacherResponse]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+
+def teacher_to_dict(db_teacher: Teacher) -> dict:
+    # 缓存里只放可序列化的数据，方便换成共享存储
+    response = TeacherResponse.model_validate(db_teacher, from_attributes=True)
+    return response.model_dump(mode="json")
 
 
 # 创建课程教师
@@ -50,6 +62,7 @@ def create_teacher(
     db.add(db_teacher)
     db.commit()
     db.refresh(db_teacher)
+    teacher_cache.invalidate()
     return db_teacher
 
 
@@ -57,10 +70,25 @@ def create_teacher(
 @router.get("/{teacher_id}", response_model=TeacherResponse)
 def get_teacher(
     teacher_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user),
 ):
-    teacher = db.query(Teacher).filter(Teacher.id == teacher_id).first()
+    version = teacher_cache.get_or_load(
+        teacher_cache.item_key(teacher_id, "version"),
+        lambda: item_version(db, Teacher, teacher_id),
+    )
+    unchanged = not_modified(request, response, version)
+    if unchanged is not None:
+        return unchanged
+
+    def load():
+        teacher = db.query(Teacher).filter(Teacher.id == teacher_id).first()
+        if teacher:
+            return teacher_to_dict(teacher)
+
+    teacher = teacher_cache.get_or_load(teacher_cache.item_key(teacher_id), load)
     if not teacher:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Teacher not found"
@@ -71,17 +99,36 @@ def get_teacher(
 # 获取课程教师列表
 @router.get("", response_model=ResponseTeacherList)
 def list_teachers(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    order_by: Literal["id", "updated_at"] = "id",
+    with_total: bool = False,
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user),
 ):
-    teachers = (
-        db.query(Teacher).filter(Teacher.is_active == 1).offset(skip).limit(limit).all()
+    version = teacher_cache.get_or_load(
+        teacher_cache.list_key(version=True),
+        lambda: collection_version(db, Teacher, Teacher.is_active == 1),
     )
-    return {
-        "items": teachers,
-    }
+    unchanged = not_modified(request, response, version)
+    if unchanged is not None:
+        return unchanged
+
+    def load():
+        query = db.query(Teacher).filter(Teacher.is_active == 1)
+        page = paginate(
+            query, sort_keys(Teacher, order_by), limit, cursor, skip, with_total
+        )
+        page["items"] = [teacher_to_dict(i) for i in page["items"]]
+        return page
+
+    key = teacher_cache.list_key(
+        skip=skip, limit=limit, cursor=cursor, order_by=order_by, with_total=with_total
+    )
+    return teacher_cache.get_or_load(key, load)
 
 
 # 更新课程教师
@@ -103,6 +150,7 @@ def update_teacher(
 
     db.commit()
     db.refresh(db_teacher)
+    teacher_cache.invalidate(teacher_id)
     return db_teacher
 
 
@@ -121,6 +169,7 @@ def delete_teacher(
 
     db_teacher.is_active = False
     db.commit()
+    teacher_cache.invalidate(teacher_id)
     return {
         "success": True,
     }
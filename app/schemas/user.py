@@ -16,7 +16,7 @@ class AdminUserLogin(BaseModel):
 
 
 class AdminUserResponse(AdminUserBase):
-    id: str
+    id: int
 
     class Config:
         from_attributes = True
@@ -0,0 +1,109 @@
+"""Benchmark ``list_courses`` serialization: validated vs. trusted responses.
+
+Builds a synthetic page (100 courses x 500 lessons by default) with the same
+``course_payload`` the route uses, then times both response paths::
+
+    python -m app.serialization_benchmark --courses 100 --lessons 500
+"""
+
+import argparse
+import gzip
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.routes.course import CourseListResponse, course_payload
+from app.utils.responses import JSON_RESPONSE_CLASS
+
+
+def build_page(courses: int, lessons: int) -> dict:
+    now = datetime(2026, 1, 5, 10, 0)
+    teacher = SimpleNamespace(id=1, name="教师")
+    program = SimpleNamespace(id=1, name="项目")
+    items = []
+    for course_id in range(1, courses + 1):
+        course = SimpleNamespace(
+            id=course_id,
+            teacher_id=teacher.id,
+            program_id=program.id,
+            comment=f"课程 {course_id}",
+            is_active=True,
+            created_at=now,
+            updated_at=now,
+            virtual_lessons=False,
+            teacher=teacher,
+            program=program,
+        )
+        course_lessons = [
+            {
+                "id": course_id * lessons + i,
+                "start_time": now + timedelta(days=i),
+                "end_time": now + timedelta(days=i, hours=1),
+            }
+            for i in range(lessons)
+        ]
+        items.append(course_payload(course, course_lessons))
+    return {"items": items, "next_cursor": None, "total": None}
+
+
+def validated(adapter: TypeAdapter, page: dict) -> bytes:
+    # 与 FastAPI 处理 response_model 的步骤一致：校验、转成 JSON 兼容对象、再编码
+    content = adapter.dump_python(adapter.validate_python(page), mode="json")
+    return JSONResponse(content).body
+
+
+def trusted(page: dict) -> bytes:
+    return JSON_RESPONSE_CLASS(page).body
+
+
+def timed(func, runs: int):
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        body = func()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples), body
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--courses", type=int, default=100)
+    parser.add_argument("--lessons", type=int, default=500)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    page = build_page(args.courses, args.lessons)
+    adapter = TypeAdapter(CourseListResponse)
+    results = [
+        ("response_model + json", *timed(lambda: validated(adapter, page), args.runs)),
+        (
+            f"trusted + {JSON_RESPONSE_CLASS.__name__}",
+            *timed(lambda: trusted(page), args.runs),
+        ),
+    ]
+    print(f"{args.courses} courses x {args.lessons} lessons, median of {args.runs}")
+    print(f"{'path':<28} {'ms':>9} {'bytes':>11}")
+    for name, ms, body in results:
+        print(f"{name:<28} {ms:>9.1f} {len(body):>11}")
+
+    # 压缩中间件的开销：和 GZipMiddleware 相同的压缩级别
+    body = results[-1][2]
+    ms, compressed = timed(lambda: gzip.compress(body, compresslevel=6), args.runs)
+    print(f"{'gzip -6':<28} {ms:>9.1f} {len(compressed):>11}")
+    try:
+        import brotli
+    except ImportError:
+        pass
+    else:
+        ms, compressed = timed(lambda: brotli.compress(body, quality=4), args.runs)
+        print(f"{'brotli -4':<28} {ms:>9.1f} {len(compressed):>11}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""Measure cold start: import time of ``app`` and the time to run its lifespan.
+
+Each measurement runs in a fresh interpreter so nothing is cached::
+
+    python -m app.startup_report --budget-ms 1500
+
+Exits non-zero when the median startup exceeds ``--budget-ms``.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+STARTUP_SCRIPT = """
+import time
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+import asyncio
+async def boot():
+    async with app.lifespan(app.app):
+        pass
+asyncio.run(boot())
+t2 = time.perf_counter()
+print(f"{(t1 - t0) * 1000:.1f} {(t2 - t1) * 1000:.1f}")
+"""
+
+
+def _run(args: list, env: dict) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args], capture_output=True, text=True, env=env, check=True
+    )
+
+
+def import_times(env: dict, top: int, max_depth: int) -> list:
+    # -X importtime 输出到 stderr：self(us) | cumulative(us) | module
+    result = _run(["-X", "importtime", "-c", "import app"], env)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:") :].split("|")
+        # 每嵌套一层缩进两格；更深层的耗时已经算在上层的 cumulative 里
+        depth = (len(module) - len(module.lstrip()) - 1) // 2
+        if depth > max_depth:
+            continue
+        rows.append((int(cumulative_us), int(self_us), module.strip()))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def startup_times(env: dict, runs: int) -> list:
+    samples = []
+    for _ in range(runs):
+        result = _run(["-c", STARTUP_SCRIPT], env)
+        import_ms, lifespan_ms = result.stdout.split()[-2:]
+        samples.append((float(import_ms), float(lifespan_ms)))
+    return samples
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for cumulative_us, self_us, module in import_times(env, args.top, args.depth):
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {module}")
+
+    samples = startup_times(env, args.runs)
+    import_ms = statistics.median(s[0] for s in samples)
+    lifespan_ms = statistics.median(s[1] for s in samples)
+    total_ms = statistics.median(s[0] + s[1] for s in samples)
+    print()
+    print(f"import app   {import_ms:8.1f} ms (median of {args.runs})")
+    print(f"lifespan     {lifespan_ms:8.1f} ms")
+    print(f"total        {total_ms:8.1f} ms")
+
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        print(f"startup {total_ms:.1f} ms exceeds budget {args.budget_ms:.1f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries may also carry an absolute expiry."""
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or expires_at > time.time():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        expires_at: Optional[float] = None,
+        ttl: Optional[float] = None,
+    ) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        if ttl is not None:
+            deadline = time.time() + ttl
+            expires_at = deadline if expires_at is None else min(expires_at, deadline)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND") or "memory"
+CACHE_URL = os.getenv("CACHE_URL") or "redis://localhost:6379/0"
+CACHE_SIZE = int(os.getenv("CACHE_SIZE") or 10000)
+CACHE_TTL = float(os.getenv("CACHE_TTL") or 300)
+
+
+class CacheBackend(ABC):
+    """Storage used by :class:`ReadThroughCache`; values must be JSON-safe."""
+
+    @abstractmethod
+    def get(self, key: str) -> Any: ...
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None: ...
+
+    @abstractmethod
+    def delete(self, *keys: str) -> None: ...
+
+    @abstractmethod
+    def incr(self, key: str) -> int: ...
+
+    @abstractmethod
+    def counter(self, key: str) -> int: ...
+
+
+class MemoryBackend(CacheBackend):
+    def __init__(self, maxsize: int = CACHE_SIZE):
+        self._cache = TTLCache(maxsize=maxsize)
+        # 计数器不参与 LRU 淘汰，否则代数回退会让旧的列表缓存重新生效
+        self._counters: dict = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def set(self, key, value, ttl=None):
+        self._cache.set(key, value, ttl=ttl)
+
+    def delete(self, *keys):
+        for key in keys:
+            self._cache.delete(key)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def counter(self, key):
+        return self._counters.get(key, 0)
+
+
+class RedisBackend(CacheBackend):
+    """Shared backend for multi-worker deployments (needs the redis package)."""
+
+    def __init__(self, url: str = CACHE_URL):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        value = self._client.get(key)
+        return None if value is None else json.loads(value)
+
+    def set(self, key, value, ttl=None):
+        data = json.dumps(value, default=str)
+        if ttl is None:
+            self._client.set(key, data)
+        else:
+            self._client.set(key, data, px=int(ttl * 1000))
+
+    def delete(self, *keys):
+        if keys:
+            self._client.delete(*keys)
+
+    def incr(self, key):
+        return self._client.incr(key)
+
+    def counter(self, key):
+        return int(self._client.get(key) or 0)
+
+
+_backend: Optional[CacheBackend] = None
+
+
+def get_backend() -> CacheBackend:
+    global _backend
+    if _backend is None:
+        _backend = RedisBackend() if CACHE_BACKEND == "redis" else MemoryBackend()
+    return _backend
+
+
+def set_backend(backend: CacheBackend) -> None:
+    global _backend
+    _backend = backend
+
+
+# namespace -> ReadThroughCache，用于 /diagnostics/cache
+caches: dict = {}
+
+
+class ReadThroughCache:
+    """Read-through cache for one resource type.
+
+    Each item key embeds that item's own version counter and list keys embed
+    a namespace generation. A write bumps the version of the items it touched
+    plus the generation, so unrelated items stay cached; a reader that loaded
+    before the write can only store its stale value under the old key, which
+    nobody reads again.
+    """
+
+    def __init__(self, namespace: str, ttl: float = CACHE_TTL):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        caches[namespace] = self
+
+    def generation(self) -> int:
+        return get_backend().counter(f"{self.namespace}:generation")
+
+    def item_version(self, item_id) -> int:
+        return get_backend().counter(f"{self.namespace}:item:{item_id}:v")
+
+    def item_key(self, item_id, kind: str = "item") -> str:
+        return f"{self.namespace}:{kind}:{self.item_version(item_id)}:{item_id}"
+
+    def list_key(self, **params) -> str:
+        query = "&".join(f"{k}={v}" for k, v in sorted(params.items()))
+        return f"{self.namespace}:list:{self.generation()}:{query}"
+
+    def get_or_load(self, key: str, loader: Callable[[], Any]) -> Any:
+        backend = get_backend()
+        value = backend.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        value = loader()
+        if value is not None:
+            backend.set(key, value, ttl=self.ttl)
+        return value
+
+    def invalidate(self, *item_ids) -> None:
+        # 在提交之后调用；新建的行还没有缓存，不传 id 只让列表失效
+        backend = get_backend()
+        # 旧版本的键不会再被读到，这里只是尽早释放
+        backend.delete(
+            *[
+                self.item_key(item_id, kind)
+                for item_id in item_ids
+                for kind in ("item", "version")
+            ]
+        )
+        for item_id in item_ids:
+            backend.incr(f"{self.namespace}:item:{item_id}:v")
+        backend.incr(f"{self.namespace}:generation")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def cache_stats() -> dict:
+    return {namespace: cache.stats() for namespace, cache in caches.items()}
@@ -0,0 +1,95 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def resource_version(last_modified: Optional[datetime], *parts) -> dict:
+    # 只含可 JSON 序列化的值，可以直接放进 ReadThroughCache
+    return {
+        "etag": make_etag(last_modified, *parts),
+        "last_modified": last_modified.isoformat() if last_modified else None,
+    }
+
+
+def item_version(db: Session, model, item_id: int) -> Optional[dict]:
+    updated_at = db.scalar(select(model.updated_at).where(model.id == item_id))
+    if updated_at is None:
+        return None
+    return resource_version(updated_at, model.__tablename__, item_id)
+
+
+def collection_version(db: Session, model, *criteria) -> dict:
+    # 行数和 id 之和用来发现删除、停用等不一定改变 max(updated_at) 的变化
+    last_modified, count, id_sum = db.execute(
+        select(
+            func.max(model.updated_at), func.count(model.id), func.sum(model.id)
+        ).where(*criteria)
+    ).one()
+    return resource_version(last_modified, model.__tablename__, count, id_sum)
+
+
+def page_version(model, items, *parts) -> dict:
+    # 只看已经查出的这一页，不对整张表做聚合
+    rows = [(item.id, item.updated_at) for item in items]
+    last_modified = max((ts for _, ts in rows if ts), default=None)
+    return resource_version(last_modified, model.__tablename__, rows, *parts)
+
+
+def _http_date(value: datetime) -> str:
+    # updated_at 存的是服务器本地时间
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def _etag_matches(etag: str, if_none_match: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match 使用弱比较
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag.removeprefix("W/") in tags
+
+
+def not_modified(
+    request: Request, response: Response, version: Optional[dict]
+) -> Optional[Response]:
+    """Set ETag/Last-Modified on ``response``; return a 304 if the client is current.
+
+    The path and query string are folded into the ETag so that different
+    representations, filters or pages of a resource never share a validator.
+    """
+    if version is None:
+        return None
+
+    headers = {"ETag": make_etag(version["etag"], request.url.path, request.url.query)}
+    last_modified = version["last_modified"]
+    if last_modified:
+        last_modified = datetime.fromisoformat(last_modified).replace(microsecond=0)
+        headers["Last-Modified"] = _http_date(last_modified)
+    response.headers.update(headers)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if _etag_matches(headers["ETag"], if_none_match):
+            return Response(status_code=304, headers=headers)
+        return None
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return None
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        if last_modified.astimezone(timezone.utc) <= since:
+            return Response(status_code=304, headers=headers)
+    return None
@@ -0,0 +1,42 @@
+from typing import List, Tuple
+
+import numpy as np
+
+
+class IntervalIndex:
+    """Sorted index over half-open ``[start, end)`` intervals.
+
+    Intervals are sorted by start and carry a running maximum of their ends,
+    so the candidates for a query ``[s, e)`` are one contiguous slice found
+    with two binary searches; only that slice is scanned.
+    """
+
+    def __init__(self, starts, ends):
+        starts = np.asarray(starts, dtype="datetime64[s]")
+        ends = np.asarray(ends, dtype="datetime64[s]")
+        self.order = np.argsort(starts, kind="stable")
+        self.starts = starts[self.order]
+        self.ends = ends[self.order]
+        # 前缀最大结束时间单调不减，可以二分
+        self.max_ends = np.maximum.accumulate(self.ends) if len(ends) else self.ends
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def overlaps(self, starts, ends) -> List[Tuple[int, int]]:
+        """Return ``(query_index, interval_index)`` pairs that overlap."""
+        starts = np.asarray(starts, dtype="datetime64[s]")
+        ends = np.asarray(ends, dtype="datetime64[s]")
+        if not len(self) or not len(starts):
+            return []
+
+        # 区间 j 与 [s, e) 相交 <=> start_j < e 且 end_j > s
+        hi = np.searchsorted(self.starts, ends, side="left")
+        lo = np.searchsorted(self.max_ends, starts, side="right")
+
+        pairs = []
+        for i in np.nonzero(lo < hi)[0].tolist():
+            window = slice(lo[i], hi[i])
+            hits = np.nonzero(self.ends[window] > starts[i])[0] + lo[i]
+            pairs.extend((i, j) for j in self.order[hits].tolist())
+        return pairs
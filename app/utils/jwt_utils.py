@@ -1,13 +1,74 @@
+import hashlib
+import heapq
 import os
+import threading
+import time
 from datetime import datetime, timedelta
 
 import jwt
 from fastapi import HTTPException, Security
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
+from app.utils.cache import CACHE_BACKEND, TTLCache, get_backend
+
 security = HTTPBearer()
 
 JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY") or "secret"
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE") or 10000)
+
+# 已验证的令牌 -> payload，在令牌 exp 时过期
+token_cache = TTLCache(maxsize=AUTH_CACHE_SIZE)
+# user_id -> 已解析的管理员信息
+principal_cache = TTLCache(maxsize=AUTH_CACHE_SIZE)
+
+
+class RevokedTokens:
+    """Logged-out tokens, kept until their own ``exp`` and never evicted earlier.
+
+    Held in process memory, so with several workers a logout only applies to
+    the worker that handled it; with ``CACHE_BACKEND=redis`` revocations are
+    also written to the shared backend and checked on every request.
+    """
+
+    def __init__(self):
+        self._expiry: dict = {}
+        # (exp, token) 小顶堆，按过期时间清理
+        self._heap: list = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return "auth:revoked:" + hashlib.sha256(token.encode()).hexdigest()
+
+    def _prune(self, now: float):
+        while self._heap and self._heap[0][0] <= now:
+            exp, token = heapq.heappop(self._heap)
+            if self._expiry.get(token) == exp:
+                del self._expiry[token]
+
+    def add(self, token: str, exp: float):
+        now = time.time()
+        with self._lock:
+            self._prune(now)
+            self._expiry[token] = exp
+            heapq.heappush(self._heap, (exp, token))
+        if CACHE_BACKEND == "redis" and exp > now:
+            get_backend().set(self._key(token), True, ttl=exp - now)
+
+    def __contains__(self, token: str) -> bool:
+        exp = self._expiry.get(token)
+        if exp is not None and exp > time.time():
+            return True
+        if CACHE_BACKEND == "redis":
+            return get_backend().get(self._key(token)) is not None
+        return False
+
+    def stats(self) -> dict:
+        return {"size": len(self._expiry), "shared": CACHE_BACKEND == "redis"}
+
+
+# 主动注销的令牌，保留到令牌本身过期为止
+revoked_tokens = RevokedTokens()
 
 
 def create_access_token(user_id: str):
@@ -20,14 +81,39 @@ def create_access_token(user_id: str):
 
 
 def decode_token(token: str):
+    # 先查注销列表：其他 worker 注销的令牌可能还在本进程的 token_cache 里
+    if token in revoked_tokens:
+        raise HTTPException(status_code=401, detail="令牌已失效")
+
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+
     try:
         payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=["HS256"])
-        return payload
     except jwt.ExpiredSignatureError as e:
         raise HTTPException(status_code=401, detail="令牌已过期") from e
     except jwt.InvalidTokenError as e:
         raise HTTPException(status_code=401, detail="无效的令牌") from e
 
+    token_cache.set(token, payload, expires_at=payload.get("exp"))
+    return payload
+
+
+def revoke_token(token: str):
+    payload = decode_token(token)
+    token_cache.delete(token)
+    principal_cache.delete(payload.get("user_id"))
+    revoked_tokens.add(token, payload.get("exp") or float("inf"))
+
+
+def auth_cache_stats():
+    return {
+        "tokens": token_cache.stats(),
+        "principals": principal_cache.stats(),
+        "revoked": revoked_tokens.stats(),
+    }
+
 
 def get_current_user(credentials: HTTPAuthorizationCredentials = Security(security)):
     token = credentials.credentials
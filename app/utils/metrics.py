@@ -0,0 +1,265 @@
+"""Per-route request metrics and SQL timing, rendered in Prometheus text format.
+
+``MetricsMiddleware`` puts a ``RequestStats`` in a context variable for the
+duration of each request; the SQLAlchemy cursor hooks and the pool add to it,
+and the middleware folds it into the process-wide registry when the response
+is finished. Each worker process keeps its own registry.
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+# 超过这个耗时的请求连同执行过的 SQL 一起写日志，0 表示不记录
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS") or 1000)
+# 每个请求最多保留的 SQL 条数，只有慢请求日志会用到
+SLOW_REQUEST_MAX_STATEMENTS = int(os.getenv("SLOW_REQUEST_MAX_STATEMENTS") or 50)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+# 没有匹配到路由的请求归到一起，避免随意的 URL 撑大标签数量
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_time", "rows", "pool_wait", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.rows = 0
+        self.pool_wait = 0.0
+        self.statements: List[Tuple[str, float]] = []
+
+    def record_query(self, statement: str, seconds: float, rowcount: int):
+        self.queries += 1
+        self.db_time += seconds
+        # rowcount：SELECT 为返回行数，DML 为影响行数；驱动不知道时是 -1
+        if rowcount > 0:
+            self.rows += rowcount
+        if len(self.statements) < SLOW_REQUEST_MAX_STATEMENTS:
+            self.statements.append((statement, seconds))
+
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar(
+    "current_request", default=None
+)
+
+
+def record_pool_wait(seconds: float):
+    stats = current_request.get()
+    if stats is not None:
+        stats.pool_wait += seconds
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and current_request.get() is not None:
+        context._metrics_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_metrics_start", None)
+    stats = current_request.get()
+    if start is None or stats is None:
+        return
+    stats.record_query(statement, time.perf_counter() - start, cursor.rowcount)
+
+
+def instrument_sql():
+    # 挂在 Engine 类上：主库、从库和异步引擎底层的同步引擎都会生效
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class RouteMetrics:
+    def __init__(self):
+        self.duration = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.db_time = Histogram(LATENCY_BUCKETS)
+        self.rows = 0
+        self.pool_wait = 0.0
+
+
+def _labels(**labels) -> str:
+    def escape(value) -> str:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"')
+        return value.replace("\n", "\\n")
+
+    return ",".join(f'{key}="{escape(value)}"' for key, value in labels.items())
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def metric_lines(
+    name: str, kind: str, help: str, samples: Iterable[Tuple[dict, float]]
+) -> List[str]:
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        lines.append(f"{name}{{{_labels(**labels)}}} {_format_value(value)}")
+    return lines
+
+
+def _histogram_lines(
+    name: str, help: str, histograms: Iterable[Tuple[dict, Histogram]]
+) -> List[str]:
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} histogram"]
+    for labels, histogram in histograms:
+        cumulative = 0
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{{{_labels(**labels, le=bound)}}} {cumulative}")
+        lines.append(
+            f"{name}_bucket{{{_labels(**labels, le='+Inf')}}} {histogram.count}"
+        )
+        lines.append(f"{name}_sum{{{_labels(**labels)}}} {histogram.sum!r}")
+        lines.append(f"{name}_count{{{_labels(**labels)}}} {histogram.count}")
+    return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.routes: Dict[Tuple[str, str], RouteMetrics] = {}
+        self.responses: Dict[Tuple[str, str, int], int] = {}
+
+    def record(
+        self, method: str, route: str, status: int, seconds: float, stats: RequestStats
+    ):
+        with self._lock:
+            metrics = self.routes.get((method, route))
+            if metrics is None:
+                metrics = self.routes[(method, route)] = RouteMetrics()
+            metrics.duration.observe(seconds)
+            metrics.queries.observe(stats.queries)
+            metrics.db_time.observe(stats.db_time)
+            metrics.rows += stats.rows
+            metrics.pool_wait += stats.pool_wait
+            key = (method, route, status)
+            self.responses[key] = self.responses.get(key, 0) + 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            routes = [
+                ({"method": method, "route": route}, metrics)
+                for (method, route), metrics in sorted(self.routes.items())
+            ]
+            responses = [
+                ({"method": method, "route": route, "status": status}, count)
+                for (method, route, status), count in sorted(self.responses.items())
+            ]
+            return [
+                *metric_lines(
+                    "http_requests_total",
+                    "counter",
+                    "Requests by route and status code.",
+                    responses,
+                ),
+                *_histogram_lines(
+                    "http_request_duration_seconds",
+                    "Request latency by route.",
+                    ((labels, m.duration) for labels, m in routes),
+                ),
+                *_histogram_lines(
+                    "http_request_db_queries",
+                    "SQL statements executed per request.",
+                    ((labels, m.queries) for labels, m in routes),
+                ),
+                *_histogram_lines(
+                    "http_request_db_seconds",
+                    "Time spent executing SQL per request.",
+                    ((labels, m.db_time) for labels, m in routes),
+                ),
+                *metric_lines(
+                    "http_request_db_rows_total",
+                    "counter",
+                    "Rows returned or affected by SQL, as reported by the driver.",
+                    ((labels, m.rows) for labels, m in routes),
+                ),
+                *metric_lines(
+                    "http_request_pool_wait_seconds_total",
+                    "counter",
+                    "Time spent waiting for a pooled connection.",
+                    ((labels, m.pool_wait) for labels, m in routes),
+                ),
+            ]
+
+
+registry = MetricsRegistry()
+
+
+def log_slow_request(
+    method: str, path: str, status: int, seconds: float, stats: RequestStats
+):
+    lines = [
+        f"slow request {method} {path} {status} {seconds * 1000:.0f} ms, "
+        f"{stats.queries} queries, db {stats.db_time * 1000:.0f} ms, "
+        f"pool wait {stats.pool_wait * 1000:.0f} ms"
+    ]
+    for statement, statement_seconds in stats.statements:
+        statement = " ".join(statement.split())
+        lines.append(f"  {statement_seconds * 1000:8.1f} ms  {statement}")
+    if stats.queries > len(stats.statements):
+        lines.append(f"  ... {stats.queries - len(stats.statements)} more")
+    logger.warning("\n".join(lines))
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware; streaming responses are timed until the last chunk."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            seconds = time.perf_counter() - start
+            current_request.reset(token)
+            # 路由匹配后 FastAPI 会把 route 写进 scope，用路径模板作标签
+            route = scope.get("route")
+            path = getattr(route, "path", None) or UNMATCHED_ROUTE
+            registry.record(scope["method"], path, status_code, seconds, stats)
+            if SLOW_REQUEST_MS and seconds * 1000 >= SLOW_REQUEST_MS:
+                log_slow_request(
+                    scope["method"], scope["path"], status_code, seconds, stats
+                )
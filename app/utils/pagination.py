@@ -0,0 +1,87 @@
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query
+
+
+def sort_keys(model, order_by: str = "id") -> list:
+    if order_by == "updated_at":
+        return [model.updated_at, model.id]
+    return [model.id]
+
+
+def _key_value(row, key):
+    if isinstance(row, dict):
+        return row[key.key]
+    return getattr(row, key.key)
+
+
+def encode_cursor(keys: list, row) -> str:
+    values = []
+    for key in keys:
+        value = _key_value(row, key)
+        values.append(value.isoformat() if isinstance(value, datetime) else value)
+    payload = json.dumps({"k": [key.key for key in keys], "v": values})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(keys: list, cursor: str) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload["k"] != [key.key for key in keys]:
+            raise ValueError("cursor does not match the requested ordering")
+        values = []
+        for key, value in zip(keys, payload["v"], strict=True):
+            if value is not None and key.type.python_type is datetime:
+                value = datetime.fromisoformat(value)
+            values.append(value)
+        return values
+    except (ValueError, KeyError, TypeError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="无效的游标"
+        ) from e
+
+
+def after(keys: list, values: list):
+    # (a, b) > (x, y) 展开成 a > x OR (a = x AND b > y)，方便走索引
+    return or_(
+        *[
+            and_(*[k == v for k, v in zip(keys[:i], values[:i])], key > values[i])
+            for i, key in enumerate(keys)
+        ]
+    )
+
+
+def paginate(
+    query: Query,
+    keys: List,
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    with_total: bool = False,
+) -> dict:
+    """Page ``query`` by ``keys``.
+
+    With a ``cursor`` the page starts right after the encoded key values
+    (keyset paging); otherwise ``skip`` is applied as a plain OFFSET so that
+    existing clients keep working. Either way ``next_cursor`` is returned
+    whenever the page is full.
+    """
+    total = query.order_by(None).count() if with_total else None
+
+    query = query.order_by(*keys)
+    if cursor:
+        query = query.filter(after(keys, decode_cursor(keys, cursor)))
+    elif skip:
+        query = query.offset(skip)
+
+    items = query.limit(limit).all()
+    next_cursor = None
+    if items and len(items) == limit:
+        next_cursor = encode_cursor(keys, items[-1])
+    return {"items": items, "next_cursor": next_cursor, "total": total}
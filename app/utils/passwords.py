@@ -0,0 +1,64 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS") or 12)
+# 专用线程数；bcrypt 计算时会释放 GIL
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS") or 4)
+# 同时在排队或计算中的哈希数上限
+PASSWORD_HASH_MAX_PENDING = int(
+    os.getenv("PASSWORD_HASH_MAX_PENDING") or PASSWORD_HASH_WORKERS * 2
+)
+# 拿不到名额时最多等待的秒数
+PASSWORD_HASH_TIMEOUT = float(os.getenv("PASSWORD_HASH_TIMEOUT") or 2)
+
+
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    # passlib/bcrypt 在第一次用到时才加载，不拖慢启动
+    from passlib.context import CryptContext
+
+    # min/max 都设为当前 cost，cost 变化后旧哈希会在下次登录时重新计算
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=BCRYPT_ROUNDS,
+        bcrypt__min_rounds=BCRYPT_ROUNDS,
+        bcrypt__max_rounds=BCRYPT_ROUNDS,
+    )
+
+
+_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+_slots = asyncio.Semaphore(PASSWORD_HASH_MAX_PENDING)
+
+
+async def _run(fn, *args):
+    try:
+        await asyncio.wait_for(_slots.acquire(), PASSWORD_HASH_TIMEOUT)
+    except asyncio.TimeoutError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="服务繁忙，请稍后再试",
+            headers={"Retry-After": "1"},
+        ) from e
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
+    finally:
+        _slots.release()
+
+
+async def hash_password(password: str) -> str:
+    return await _run(get_pwd_context().hash, password)
+
+
+async def verify_password(
+    password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    # 返回 (是否匹配, 需要替换的新哈希)
+    return await _run(get_pwd_context().verify_and_update, password, hashed_password)
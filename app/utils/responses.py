@@ -0,0 +1,51 @@
+import json
+import os
+from datetime import date
+from typing import Any, Optional
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse as JSON_RESPONSE_CLASS
+except ImportError:  # orjson 是可选依赖，没有时退回标准库 json
+    orjson = None
+    JSON_RESPONSE_CLASS = JSONResponse
+
+# 为 0 时所有响应都重新走 response_model 校验，方便排查序列化问题
+SKIP_RESPONSE_VALIDATION = os.getenv("SKIP_RESPONSE_VALIDATION", "1") == "1"
+
+
+def trusted_response(
+    content: Any, response: Optional[Response] = None, status_code: int = 200
+) -> Any:
+    """Render ``content`` directly, skipping ``response_model`` validation.
+
+    Only for payloads the route built in exactly the response model's shape
+    (plain dicts/lists of JSON-compatible values). Headers already set on the
+    injected ``response`` (ETag, cookies...) are carried over.
+    """
+    if not SKIP_RESPONSE_VALIDATION:
+        return content
+    rendered = JSON_RESPONSE_CLASS(content, status_code=status_code)
+    if response is not None:
+        rendered.raw_headers.extend(
+            (key, value)
+            for key, value in response.raw_headers
+            if key != b"content-length"
+        )
+    return rendered
+
+
+def _json_default(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def json_line(value: Any) -> bytes:
+    """One NDJSON line, datetimes as ISO 8601."""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(value, default=_json_default) + "\n").encode()
@@ -0,0 +1,125 @@
+import os
+from datetime import date, datetime
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+# 没有 recurring_end_date 时最多展开的天数，同时也是单次展开的最大跨度
+SCHEDULE_MAX_HORIZON_DAYS = int(os.getenv("SCHEDULE_MAX_HORIZON_DAYS") or 730)
+
+DAY = np.timedelta64(1, "D")
+
+
+def _to_day(value: Union[str, date, datetime]) -> np.datetime64:
+    if isinstance(value, datetime):
+        value = value.date()
+    return np.datetime64(value, "D")
+
+
+def _time_offset(value: str) -> np.timedelta64:
+    hour, minute = value.split(":")[:2]
+    return np.timedelta64(int(hour) * 60 + int(minute), "m")
+
+
+def _weekday(days: np.ndarray) -> np.ndarray:
+    # 1970-01-01 是周四，周一为 0
+    return (days.astype("int64") + 3) % 7
+
+
+def _month_days(
+    first: np.datetime64, lo: np.datetime64, hi: np.datetime64
+) -> np.ndarray:
+    first_month = first.astype("datetime64[M]")
+    k_lo = max(int((lo.astype("datetime64[M]") - first_month).astype("int64")), 0)
+    k_hi = int((hi.astype("datetime64[M]") - first_month).astype("int64"))
+    months = first_month + np.arange(k_lo, k_hi + 1)
+    month_start = months.astype("datetime64[D]")
+    month_length = ((months + 1).astype("datetime64[D]") - month_start).astype("int64")
+    first_day = int((first - first_month.astype("datetime64[D]")).astype("int64")) + 1
+    # 31 号开始的课程在小月落在月末
+    days = month_start + (np.minimum(first_day, month_length) - 1)
+    return days[(days >= lo) & (days <= hi)]
+
+
+def _occurrence_days(
+    recurring: str, first: np.datetime64, lo: np.datetime64, hi: np.datetime64
+) -> np.ndarray:
+    if recurring == "daily":
+        return np.arange(lo, hi + DAY, dtype="datetime64[D]")
+
+    if recurring == "weekly":
+        k0 = -(-int((lo - first).astype("int64")) // 7)
+        return np.arange(first + 7 * k0 * DAY, hi + DAY, 7 * DAY, dtype="datetime64[D]")
+
+    if recurring == "monthly":
+        return _month_days(first, lo, hi)
+
+    days = np.arange(lo, hi + DAY, dtype="datetime64[D]")
+    if recurring == "weekdays":
+        mask = _weekday(days) < 5
+    elif recurring == "weekends":
+        mask = _weekday(days) >= 5
+    else:
+        raise ValueError(f"Unsupported recurring mode: {recurring}")
+    # 和之前的行为保持一致：开始日期本身总是一节课
+    if len(days) and days[0] == first:
+        mask[0] = True
+    return days[mask]
+
+
+def expand_schedule(
+    schedule,
+    window_start: Optional[datetime] = None,
+    window_end: Optional[datetime] = None,
+    max_horizon_days: Optional[int] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Expand one ``CourseSchedule`` into ``datetime64[s]`` start/end arrays.
+
+    Occurrences are clipped to ``[window_start, window_end]`` and never span
+    more than ``max_horizon_days`` from the first generated day.
+    """
+    horizon = max_horizon_days or SCHEDULE_MAX_HORIZON_DAYS
+    first = _to_day(schedule.date)
+    lo = max(first, _to_day(window_start)) if window_start else first
+
+    hi = lo + horizon * DAY
+    if schedule.recurring_end_date:
+        hi = min(hi, _to_day(schedule.recurring_end_date))
+    if window_end:
+        hi = min(hi, _to_day(window_end))
+
+    if hi < lo:
+        empty = np.array([], dtype="datetime64[s]")
+        return empty, empty
+
+    days = _occurrence_days(schedule.recurring, first, lo, hi)
+    starts = (days + _time_offset(schedule.start_time)).astype("datetime64[s]")
+    ends = (days + _time_offset(schedule.end_time)).astype("datetime64[s]")
+
+    mask = np.ones(len(starts), dtype=bool)
+    if window_start:
+        mask &= starts >= np.datetime64(window_start, "s")
+    if window_end:
+        mask &= starts <= np.datetime64(window_end, "s")
+    if not mask.all():
+        starts, ends = starts[mask], ends[mask]
+    return starts, ends
+
+
+def expand_schedules(
+    schedules,
+    window_start: Optional[datetime] = None,
+    window_end: Optional[datetime] = None,
+    max_horizon_days: Optional[int] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    if not schedules:
+        empty = np.array([], dtype="datetime64[s]")
+        return empty, empty
+    expanded = [
+        expand_schedule(schedule, window_start, window_end, max_horizon_days)
+        for schedule in schedules
+    ]
+    starts = np.concatenate([s for s, _ in expanded])
+    ends = np.concatenate([e for _, e in expanded])
+    order = np.argsort(starts, kind="stable")
+    return starts[order], ends[order]
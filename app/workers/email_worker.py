@@ -0,0 +1,277 @@
+"""Send pending ``EmailLog`` rows over a reused SMTP connection.
+
+Several workers can run side by side; each claims its own batch with
+``SELECT ... FOR UPDATE SKIP LOCKED``::
+
+    python -m app.workers.email_worker
+"""
+
+import argparse
+import os
+import signal
+import smtplib
+import sys
+import time
+from datetime import datetime
+from email.message import EmailMessage
+from typing import List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.models import SessionLocal
+from app.models.models import EmailLog
+
+SMTP_HOST = os.getenv("SMTP_HOST") or "localhost"
+SMTP_PORT = int(os.getenv("SMTP_PORT") or 25)
+SMTP_USER = os.getenv("SMTP_USER")
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS") == "1"
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT") or 30)
+SMTP_FROM = os.getenv("SMTP_FROM") or "no-reply@localhost"
+# 空闲超过这个时间就主动断开，服务器通常会踢掉长时间空闲的连接
+SMTP_IDLE_SECONDS = float(os.getenv("SMTP_IDLE_SECONDS") or 60)
+
+# 每次认领的邮件数；整批发送期间行锁一直持有，批次不宜过大
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE") or 100)
+# 每秒最多发送的邮件数，0 表示不限速
+EMAIL_RATE_PER_SECOND = float(os.getenv("EMAIL_RATE_PER_SECOND") or 10)
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS") or 3)
+EMAIL_RETRY_BASE_SECONDS = float(os.getenv("EMAIL_RETRY_BASE_SECONDS") or 1)
+EMAIL_POLL_SECONDS = float(os.getenv("EMAIL_POLL_SECONDS") or 5)
+# 等待时每隔这么久检查一次停止信号
+STOP_CHECK_SECONDS = 0.5
+
+
+class SMTPUnavailable(Exception):
+    """The SMTP server could not be reached; unsent mail stays pending."""
+
+
+def _is_connection_error(error: Exception) -> bool:
+    # SMTPException 继承自 OSError，要先把协议层的错误排除掉
+    if isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+        return True
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+class RateLimiter:
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate > 0 else 0
+        self.next_at = time.monotonic()
+
+    def wait(self):
+        if not self.interval:
+            return
+        now = time.monotonic()
+        if self.next_at > now:
+            time.sleep(self.next_at - now)
+        self.next_at = max(self.next_at, now) + self.interval
+
+
+class SMTPSender:
+    """One SMTP connection, opened lazily and reused across messages."""
+
+    def __init__(self):
+        self.conn: Optional[smtplib.SMTP] = None
+        self.last_used = 0.0
+
+    def connect(self) -> smtplib.SMTP:
+        idle = time.monotonic() - self.last_used
+        if self.conn is not None and idle > SMTP_IDLE_SECONDS:
+            self.close()
+        if self.conn is None:
+            conn = None
+            try:
+                conn = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=SMTP_TIMEOUT)
+                if SMTP_STARTTLS:
+                    conn.starttls()
+                if SMTP_USER:
+                    conn.login(SMTP_USER, SMTP_PASSWORD or "")
+            except (smtplib.SMTPException, OSError) as e:
+                # 建连、TLS、登录失败（包括 535 认证失败）都不是某封邮件的问题，
+                # 关掉半开的连接，整批留在 pending 等 run() 退避后重试
+                if conn is not None:
+                    try:
+                        conn.quit()
+                    except (smtplib.SMTPException, OSError):
+                        conn.close()
+                raise SMTPUnavailable(str(e)) from e
+            self.conn = conn
+        return self.conn
+
+    def close(self):
+        if self.conn is not None:
+            try:
+                self.conn.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.conn = None
+
+    def send(self, message: EmailMessage):
+        conn = self.connect()
+        try:
+            conn.send_message(message)
+        except OSError as e:
+            if _is_connection_error(e):
+                # 连接已不可用，下次重新建立
+                self.conn = None
+            raise
+        self.last_used = time.monotonic()
+
+
+def build_message(email: EmailLog) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = SMTP_FROM
+    message["To"] = email.to_email
+    message["Subject"] = email.subject
+    message.set_content(email.body)
+    return message
+
+
+def _is_transient(error: Exception) -> bool:
+    if _is_connection_error(error):
+        return True
+    # 4xx 是临时错误，5xx 是永久错误
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    code = getattr(error, "smtp_code", None)
+    return code is not None and 400 <= code < 500
+
+
+def send_with_retry(
+    sender: SMTPSender, limiter: RateLimiter, email: EmailLog
+) -> Optional[str]:
+    """Send one message; returns ``None`` on success or the error message."""
+    message = build_message(email)
+    for attempt in range(1, EMAIL_MAX_ATTEMPTS + 1):
+        limiter.wait()
+        try:
+            sender.send(message)
+            return None
+        except OSError as e:
+            if not _is_transient(e):
+                return str(e)
+            if attempt == EMAIL_MAX_ATTEMPTS:
+                if _is_connection_error(e):
+                    raise SMTPUnavailable(str(e)) from e
+                return str(e)
+            delay = EMAIL_RETRY_BASE_SECONDS * 2 ** (attempt - 1)
+            logger.warning(f"email {email.id} attempt {attempt} failed: {e}")
+            time.sleep(delay)
+
+
+def claim_batch(db: Session, batch_size: int) -> List[EmailLog]:
+    # 行锁持有到本批提交；其他 worker 跳过已锁的行，各自认领不同的邮件
+    return list(
+        db.scalars(
+            select(EmailLog)
+            .where(EmailLog.status == "pending")
+            .order_by(EmailLog.created_at, EmailLog.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+    )
+
+
+def process_batch(
+    sender: SMTPSender, limiter: RateLimiter, batch_size: int = EMAIL_BATCH_SIZE
+) -> Tuple[int, int]:
+    """Claim, send and record one batch; returns ``(sent, failed)``."""
+    db = SessionLocal()
+    try:
+        emails = claim_batch(db, batch_size)
+        if not emails:
+            db.rollback()
+            return 0, 0
+
+        results = []
+        for email in emails:
+            try:
+                error = send_with_retry(sender, limiter, email)
+            except SMTPUnavailable:
+                # SMTP 服务不可用：已发出的先记下，剩下的释放给下一轮
+                if not results:
+                    raise
+                break
+            results.append((email.id, error))
+
+        now = datetime.now()
+        db.execute(
+            update(EmailLog),
+            [
+                {
+                    "id": email_id,
+                    "status": "failed" if error else "sent",
+                    "sent_at": None if error else now,
+                    "error_msg": error,
+                }
+                for email_id, error in results
+            ],
+        )
+        db.commit()
+        failed = sum(1 for _, error in results if error)
+        return len(results) - failed, failed
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def run(once: bool = False, batch_size: int = EMAIL_BATCH_SIZE):
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        logger.info("email worker stopping after the current batch")
+        stopping = True
+
+    def wait(seconds: float):
+        # 分段睡眠，收到 SIGTERM 后不必等满退避时间
+        deadline = time.monotonic() + seconds
+        while not stopping:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(remaining, STOP_CHECK_SECONDS))
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    sender = SMTPSender()
+    limiter = RateLimiter(EMAIL_RATE_PER_SECOND)
+    backoff = EMAIL_RETRY_BASE_SECONDS
+    try:
+        while not stopping:
+            try:
+                sent, failed = process_batch(sender, limiter, batch_size)
+                backoff = EMAIL_RETRY_BASE_SECONDS
+            except SMTPUnavailable as e:
+                logger.error(f"SMTP unavailable, retrying in {backoff:.0f}s: {e}")
+                wait(backoff)
+                backoff = min(backoff * 2, 300)
+                continue
+            if sent or failed:
+                logger.info(f"email batch: {sent} sent, {failed} failed")
+            if once:
+                break
+            if sent + failed < batch_size:
+                # 队列已空，关闭连接后等待新邮件
+                sender.close()
+                wait(EMAIL_POLL_SECONDS)
+    finally:
+        sender.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--once", action="store_true", help="process one batch")
+    parser.add_argument("--batch-size", type=int, default=EMAIL_BATCH_SIZE)
+    args = parser.parse_args()
+    run(once=args.once, batch_size=args.batch_size)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""initial schema (tables previously created by create_all)
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+STATUS = ("pending", "approved", "rejected")
+
+
+def upgrade():
+    op.create_table(
+        "announcements",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("summary", sa.Text(), nullable=False),
+        sa.Column("to_email", sa.String(255), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column("start_time", sa.DateTime(), nullable=True),
+        sa.Column("end_time", sa.DateTime(), nullable=True),
+    )
+    op.create_table(
+        "programs",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("category", sa.String(255), nullable=False),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("comment", sa.Text(), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.TIMESTAMP(), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(), nullable=False),
+    )
+    op.create_table(
+        "teachers",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("email", sa.String(255), nullable=False),
+        sa.Column("phone", sa.String(255), nullable=False),
+        sa.Column("comment", sa.Text(), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.TIMESTAMP(), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(), nullable=False),
+    )
+    op.create_table(
+        "students",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("email", sa.String(255), nullable=False, unique=True),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("age", sa.Integer(), nullable=True),
+        sa.Column("sex", sa.Enum("M", "F", "Other"), nullable=True),
+        sa.Column("phone", sa.String(20), nullable=True),
+        sa.Column("created_at", sa.TIMESTAMP(), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(), nullable=False),
+    )
+    op.create_table(
+        "admin_users",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("email", sa.String(255), nullable=False, unique=True),
+        sa.Column("password_hash", sa.String(255), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(), nullable=False),
+    )
+    op.create_table(
+        "courses",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column(
+            "teacher_id", sa.Integer(), sa.ForeignKey("teachers.id"), nullable=False
+        ),
+        sa.Column(
+            "program_id", sa.Integer(), sa.ForeignKey("programs.id"), nullable=False
+        ),
+        sa.Column("schedule", sa.JSON(), nullable=False),
+        sa.Column("comment", sa.Text(), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.TIMESTAMP(), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(), nullable=False),
+    )
+    op.create_table(
+        "lessons",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column(
+            "course_id", sa.Integer(), sa.ForeignKey("courses.id"), nullable=False
+        ),
+        sa.Column("start_time", sa.TIMESTAMP(), nullable=False),
+        sa.Column("end_time", sa.TIMESTAMP(), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(), nullable=False),
+    )
+    op.create_table(
+        "email_logs",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column(
+            "student_id", sa.Integer(), sa.ForeignKey("students.id"), nullable=True
+        ),
+        sa.Column(
+            "teacher_id", sa.Integer(), sa.ForeignKey("teachers.id"), nullable=True
+        ),
+        sa.Column("to_email", sa.String(255), nullable=False),
+        sa.Column("subject", sa.String(255), nullable=False),
+        sa.Column("body", sa.Text(), nullable=False),
+        sa.Column("status", sa.Enum("pending", "sent", "failed"), nullable=True),
+        sa.Column("error_msg", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.TIMESTAMP(), nullable=True),
+        sa.Column("sent_at", sa.TIMESTAMP(), nullable=True),
+    )
+    op.create_table(
+        "enrollment_requests",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column(
+            "student_id", sa.Integer(), sa.ForeignKey("students.id"), nullable=False
+        ),
+        sa.Column(
+            "course_id", sa.Integer(), sa.ForeignKey("courses.id"), nullable=False
+        ),
+        sa.Column("lesson_ids", sa.JSON(), nullable=True),
+        sa.Column("status", sa.Enum(*STATUS), nullable=True),
+        sa.Column("created_at", sa.TIMESTAMP(), nullable=True),
+    )
+    op.create_table(
+        "leave_requests",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column(
+            "student_id", sa.Integer(), sa.ForeignKey("students.id"), nullable=False
+        ),
+        sa.Column(
+            "lesson_id", sa.Integer(), sa.ForeignKey("lessons.id"), nullable=False
+        ),
+        sa.Column("leave_date", sa.TIMESTAMP(), nullable=False),
+        sa.Column("status", sa.Enum(*STATUS), nullable=True),
+        sa.Column("created_at", sa.TIMESTAMP(), nullable=True),
+    )
+    op.create_table(
+        "withdraw_requests",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column(
+            "student_id", sa.Integer(), sa.ForeignKey("students.id"), nullable=False
+        ),
+        sa.Column(
+            "lesson_id", sa.Integer(), sa.ForeignKey("lessons.id"), nullable=False
+        ),
+        sa.Column("status", sa.Enum(*STATUS), nullable=True),
+        sa.Column("created_at", sa.TIMESTAMP(), nullable=True),
+    )
+    op.create_table(
+        "student_lessons",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column(
+            "student_id", sa.Integer(), sa.ForeignKey("students.id"), nullable=False
+        ),
+        sa.Column(
+            "lesson_id", sa.Integer(), sa.ForeignKey("lessons.id"), nullable=False
+        ),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+    )
+
+
+def downgrade():
+    for table in (
+        "student_lessons",
+        "withdraw_requests",
+        "leave_requests",
+        "enrollment_requests",
+        "email_logs",
+        "lessons",
+        "courses",
+        "admin_users",
+        "students",
+        "teachers",
+        "programs",
+        "announcements",
+    ):
+        op.drop_table(table)
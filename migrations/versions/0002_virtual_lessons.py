@@ -0,0 +1,36 @@
+"""rule-based virtual lessons: courses.virtual_lessons, lessons.is_cancelled
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "courses",
+        sa.Column(
+            "virtual_lessons", sa.Boolean(), nullable=False, server_default=sa.false()
+        ),
+    )
+    op.add_column(
+        "lessons",
+        sa.Column(
+            "is_cancelled", sa.Boolean(), nullable=False, server_default=sa.false()
+        ),
+    )
+
+
+def downgrade():
+    with op.batch_alter_table("lessons") as batch_op:
+        batch_op.drop_column("is_cancelled")
+    with op.batch_alter_table("courses") as batch_op:
+        batch_op.drop_column("virtual_lessons")
@@ -0,0 +1,47 @@
+"""composite indexes for the hot query shapes
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_lessons_course_id_start_time", "lessons", ["course_id", "start_time"]),
+    (
+        "ix_student_lessons_student_lesson_active",
+        "student_lessons",
+        ["student_id", "lesson_id", "is_active"],
+    ),
+    ("ix_courses_is_active_id", "courses", ["is_active", "id"]),
+    ("ix_teachers_is_active_id", "teachers", ["is_active", "id"]),
+    ("ix_programs_category_name", "programs", ["category", "name"]),
+    ("ix_email_logs_status_created_at", "email_logs", ["status", "created_at"]),
+    (
+        "ix_enrollment_requests_status_created_at",
+        "enrollment_requests",
+        ["status", "created_at"],
+    ),
+    ("ix_leave_requests_status_created_at", "leave_requests", ["status", "created_at"]),
+    (
+        "ix_withdraw_requests_status_created_at",
+        "withdraw_requests",
+        ["status", "created_at"],
+    ),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,21 @@
+"""range index on lessons.start_time for the calendar query
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_lessons_start_time_id", "lessons", ["start_time", "id"])
+
+
+def downgrade():
+    op.drop_index("ix_lessons_start_time_id", table_name="lessons")
@@ -0,0 +1,45 @@
+import os
+import tempfile
+
+import pytest
+
+# 测试用独立的 SQLite 库，必须在导入 app 之前设置
+_db_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_dir}/test.db"
+os.environ["DB_CREATE_ALL"] = "1"
+os.environ.pop("DATABASE_REPLICA_URLS", None)
+os.environ.pop("ASYNC_DATABASE_URL", None)
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+import app  # noqa: E402
+from app.models import Base, SessionLocal, engine  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    with TestClient(app.app) as c:
+        yield c
+    Base.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def db(client):
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def count_queries():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
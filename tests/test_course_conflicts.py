@@ -0,0 +1,152 @@
+from app.models.models import Lesson, Program, Teacher
+
+
+def schedule(date, start_time, end_time, recurring="daily", end_date=None):
+    return {
+        "date": date,
+        "start_time": start_time,
+        "end_time": end_time,
+        "recurring": recurring,
+        "recurring_end_date": end_date or date,
+    }
+
+
+def create_course(client, *schedules, virtual=False, **params):
+    return client.post(
+        "/courses",
+        params=params,
+        json={
+            "teacher_id": 1,
+            "program_id": 1,
+            "schedule": list(schedules),
+            "virtual_lessons": virtual,
+        },
+    )
+
+
+def seed(client, db):
+    db.add_all(
+        [
+            Teacher(name="t1", email="t1@example.com", phone="1"),
+            Program(category="c", name="p1"),
+        ]
+    )
+    db.commit()
+    # 课程 1：2026-01-05 到 01-09 每天 10:00-11:00
+    response = create_course(
+        client, schedule("2026-01-05", "10:00", "11:00", end_date="2026-01-09")
+    )
+    assert response.status_code == 201
+
+
+def test_conflicting_course_returns_409_with_conflicts(client, db):
+    seed(client, db)
+
+    response = create_course(
+        client,
+        schedule("2026-01-07", "10:30", "11:30", "weekly", end_date="2026-01-14"),
+    )
+
+    assert response.status_code == 409
+    detail = response.json()["detail"]
+    assert detail["message"] == "教师时间冲突"
+    # 01-14 已经在课程 1 结束之后，只有 01-07 冲突
+    assert len(detail["conflicts"]) == 1
+    conflict = detail["conflicts"][0]
+    assert conflict["start_time"] == "2026-01-07T10:30:00"
+    assert conflict["conflicts_with"]["course_id"] == 1
+    assert conflict["conflicts_with"]["start_time"] == "2026-01-07T10:00:00"
+    # 整个请求回滚，没有写入新课程的课时
+    assert db.query(Lesson).count() == 5
+
+
+def test_touching_lessons_are_not_conflicts(client, db):
+    seed(client, db)
+
+    response = create_course(
+        client, schedule("2026-01-05", "11:00", "12:00", end_date="2026-01-09")
+    )
+
+    assert response.status_code == 201
+    assert db.query(Lesson).count() == 10
+
+
+def test_allow_conflicts(client, db):
+    seed(client, db)
+
+    response = create_course(
+        client,
+        schedule("2026-01-05", "10:30", "11:30", end_date="2026-01-06"),
+        allow_conflicts=True,
+    )
+
+    assert response.status_code == 201
+    assert db.query(Lesson).filter(Lesson.course_id == 2).count() == 2
+
+
+def test_check_conflicts_does_not_write(client, db):
+    seed(client, db)
+
+    response = client.post(
+        "/courses/check-conflicts",
+        json={
+            "teacher_id": 1,
+            "program_id": 1,
+            "schedule": [
+                schedule("2026-01-08", "09:30", "10:30", end_date="2026-01-12")
+            ],
+        },
+    )
+
+    assert response.status_code == 200
+    report = response.json()
+    assert report["lesson_count"] == 5
+    assert [c["start_time"] for c in report["conflicts"]] == [
+        "2026-01-08T09:30:00",
+        "2026-01-09T09:30:00",
+    ]
+    assert db.query(Lesson).count() == 5
+
+
+def test_create_lesson_conflict(client, db):
+    seed(client, db)
+
+    response = client.post(
+        "/courses/course/1/lessons",
+        json={"start_time": "2026-01-06T10:00:00", "end_time": "2026-01-06T11:00:00"},
+    )
+    assert response.status_code == 409
+
+    response = client.post(
+        "/courses/course/1/lessons",
+        params={"allow_conflicts": True},
+        json={"start_time": "2026-01-06T10:00:00", "end_time": "2026-01-06T11:00:00"},
+    )
+    assert response.status_code == 201
+
+
+def test_virtual_course_lesson_replaces_same_start(client, db):
+    seed(client, db)
+    # 课程 2：虚拟课时，01-05 到 01-09 每天 14:00-15:00
+    response = create_course(
+        client,
+        schedule("2026-01-05", "14:00", "15:00", end_date="2026-01-09"),
+        virtual=True,
+    )
+    assert response.status_code == 201
+
+    # 同一开始时间的记录会覆盖展开出的虚拟课时，不算冲突
+    response = client.post(
+        "/courses/course/2/lessons",
+        json={"start_time": "2026-01-06T14:00:00", "end_time": "2026-01-06T15:30:00"},
+    )
+    assert response.status_code == 201
+
+    # 开始时间不同，仍然和本课程的虚拟课时冲突
+    response = client.post(
+        "/courses/course/2/lessons",
+        json={"start_time": "2026-01-07T14:30:00", "end_time": "2026-01-07T15:30:00"},
+    )
+    assert response.status_code == 409
+    conflicts = response.json()["detail"]["conflicts"]
+    assert [c["conflicts_with"]["course_id"] for c in conflicts] == [2]
@@ -0,0 +1,125 @@
+from app.models.models import (
+    EnrollmentRequest,
+    Program,
+    Student,
+    StudentLesson,
+    Teacher,
+)
+
+
+def auth_headers(client):
+    response = client.post(
+        "/admin-auth/register",
+        json={"name": "admin", "email": "admin@example.com", "password": "secret123"},
+    )
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def create_course(client, date, end_date):
+    schedule = {
+        "date": date,
+        "start_time": "10:00",
+        "end_time": "11:00",
+        "recurring": "daily",
+        "recurring_end_date": end_date,
+    }
+    response = client.post(
+        "/courses", json={"teacher_id": 1, "program_id": 1, "schedule": [schedule]}
+    )
+    assert response.status_code == 201
+
+
+def seed(client, db):
+    db.add_all(
+        [
+            Teacher(name="t1", email="t1@example.com", phone="1"),
+            Program(category="c", name="p1"),
+            Student(email="s1@example.com", name="s1"),
+            Student(email="s2@example.com", name="s2"),
+        ]
+    )
+    db.commit()
+    # 课程 1 的课时 1-3，课程 2 的课时 4-5
+    create_course(client, "2026-01-05", "2026-01-07")
+    create_course(client, "2026-01-12", "2026-01-13")
+    db.add_all(
+        [
+            # 整门课
+            EnrollmentRequest(student_id=1, course_id=1, status="pending"),
+            # 课时 4 属于课程 2，要被忽略
+            EnrollmentRequest(
+                student_id=2, course_id=1, lesson_ids=[2, 4], status="pending"
+            ),
+            EnrollmentRequest(
+                student_id=1, course_id=2, lesson_ids=[4], status="pending"
+            ),
+            # 之前退过课的记录
+            StudentLesson(student_id=1, lesson_id=4, is_active=False),
+        ]
+    )
+    db.commit()
+
+
+def enrolled_pairs(db):
+    return sorted(
+        (row.student_id, row.lesson_id, row.is_active)
+        for row in db.query(StudentLesson)
+    )
+
+
+def test_approve_is_idempotent(client, db):
+    seed(client, db)
+    headers = auth_headers(client)
+
+    response = client.post(
+        "/enrollments/approve", json={"request_ids": [1, 2, 3, 99]}, headers=headers
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "processed": [1, 2, 3],
+        "skipped": [99],
+        "enrolled": 4,
+        "reactivated": 1,
+    }
+    expected = [
+        (1, 1, True),
+        (1, 2, True),
+        (1, 3, True),
+        (1, 4, True),
+        (2, 2, True),
+    ]
+    assert enrolled_pairs(db) == expected
+
+    # 重试同一批：全部跳过，不会多插课时记录
+    response = client.post(
+        "/enrollments/approve", json={"request_ids": [1, 2, 3]}, headers=headers
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "processed": [],
+        "skipped": [1, 2, 3],
+        "enrolled": 0,
+        "reactivated": 0,
+    }
+    db.expire_all()
+    assert enrolled_pairs(db) == expected
+
+
+def test_reject_skips_processed_requests(client, db):
+    seed(client, db)
+    headers = auth_headers(client)
+    client.post("/enrollments/approve", json={"request_ids": [1]}, headers=headers)
+
+    response = client.post(
+        "/enrollments/reject", json={"request_ids": [1, 2]}, headers=headers
+    )
+
+    assert response.status_code == 200
+    assert response.json()["processed"] == [2]
+    assert response.json()["skipped"] == [1]
+    db.expire_all()
+    statuses = {r.id: r.status for r in db.query(EnrollmentRequest)}
+    assert statuses == {1: "approved", 2: "rejected", 3: "pending"}
@@ -0,0 +1,55 @@
+import numpy as np
+
+from app.utils.intervals import IntervalIndex
+
+BASE = np.datetime64("2026-01-05T00:00", "s")
+
+
+def as_times(minutes):
+    return BASE + np.asarray(minutes) * np.timedelta64(60, "s")
+
+
+def brute_force(starts, ends, q_starts, q_ends):
+    return sorted(
+        (i, j)
+        for i in range(len(q_starts))
+        for j in range(len(starts))
+        if starts[j] < q_ends[i] and q_starts[i] < ends[j]
+    )
+
+
+def test_overlaps_matches_brute_force():
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        # 粗粒度的时间点，相接（end == start）的情况会经常出现
+        starts = rng.integers(0, 60, size=40) * 15
+        ends = starts + rng.integers(1, 8, size=40) * 15
+        q_starts = rng.integers(0, 60, size=20) * 15
+        q_ends = q_starts + rng.integers(1, 8, size=20) * 15
+
+        index = IntervalIndex(as_times(starts), as_times(ends))
+        pairs = index.overlaps(as_times(q_starts), as_times(q_ends))
+
+        assert sorted(pairs) == brute_force(starts, ends, q_starts, q_ends)
+
+
+def test_touching_intervals_do_not_overlap():
+    index = IntervalIndex(as_times([60, 180]), as_times([120, 240]))
+
+    # 11:00-12:00 紧挨着 10:00-11:00 的结束和 12:00 开始的课
+    assert index.overlaps(as_times([120]), as_times([180])) == []
+    assert index.overlaps(as_times([119]), as_times([181])) == [(0, 0), (0, 1)]
+
+
+def test_long_interval_found_behind_short_ones():
+    # 第一个区间很长，后面的短区间结束得早，查询只和它相交
+    index = IntervalIndex(as_times([0, 10, 20]), as_times([600, 15, 25]))
+
+    assert index.overlaps(as_times([300]), as_times([330])) == [(0, 0)]
+
+
+def test_empty_index_and_query():
+    empty = np.array([], dtype="datetime64[s]")
+
+    assert IntervalIndex(empty, empty).overlaps(as_times([0]), as_times([60])) == []
+    assert IntervalIndex(as_times([0]), as_times([60])).overlaps(empty, empty) == []
@@ -0,0 +1,182 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.routes.course import CourseSchedule
+from app.utils.schedule import (
+    SCHEDULE_MAX_HORIZON_DAYS,
+    expand_schedule,
+    expand_schedules,
+)
+
+
+def generate_schedule(schedule):
+    # 改造前 app/routes/course.py 里的逐日循环，作为对照实现
+    current_date = datetime.strptime(schedule.date, "%Y-%m-%d")
+    end_date = datetime.strptime(schedule.recurring_end_date, "%Y-%m-%d")
+    start_time, end_time = schedule.start_time, schedule.end_time
+    schedule_dates = []
+    while current_date <= end_date:
+        schedule_dates.append(
+            {
+                "start": f"{current_date.strftime('%Y-%m-%d')} {start_time}:00",
+                "end": f"{current_date.strftime('%Y-%m-%d')} {end_time}:00",
+            }
+        )
+        if schedule.recurring == "daily":
+            current_date += timedelta(days=1)
+        elif schedule.recurring == "weekly":
+            current_date += timedelta(weeks=1)
+        elif schedule.recurring == "monthly":
+            next_month = current_date.month % 12 + 1
+            year = current_date.year + (1 if next_month == 1 else 0)
+            current_date = current_date.replace(year=year, month=next_month)
+        elif schedule.recurring == "weekdays":
+            current_date += timedelta(days=1)
+            while current_date.weekday() in [5, 6]:
+                current_date += timedelta(days=1)
+        elif schedule.recurring == "weekends":
+            current_date += timedelta(days=1)
+            while current_date.weekday() not in [5, 6]:
+                current_date += timedelta(days=1)
+    return schedule_dates
+
+
+def as_strings(values):
+    return [str(value).replace("T", " ") for value in values]
+
+
+def days(values):
+    return [str(value)[:10] for value in values]
+
+
+@pytest.mark.parametrize(
+    "recurring", ["daily", "weekly", "monthly", "weekdays", "weekends"]
+)
+# 周一、周六开始，以及跨年的月末前几天开始，覆盖开始日本身不匹配和跨年
+@pytest.mark.parametrize("start", ["2026-01-05", "2026-01-10", "2025-11-28"])
+def test_matches_old_generator(recurring, start):
+    schedule = CourseSchedule(
+        date=start,
+        start_time="09:30",
+        end_time="11:00",
+        recurring=recurring,
+        recurring_end_date="2027-03-31",
+    )
+    expected = generate_schedule(schedule)
+
+    starts, ends = expand_schedule(schedule)
+
+    assert as_strings(starts) == [lesson["start"] for lesson in expected]
+    assert as_strings(ends) == [lesson["end"] for lesson in expected]
+
+
+def test_monthly_clamps_to_month_end():
+    schedule = CourseSchedule(
+        date="2026-01-31",
+        start_time="10:00",
+        end_time="11:00",
+        recurring="monthly",
+        recurring_end_date="2026-05-31",
+    )
+
+    starts, _ = expand_schedule(schedule)
+
+    assert days(starts) == [
+        "2026-01-31",
+        "2026-02-28",
+        "2026-03-31",
+        "2026-04-30",
+        "2026-05-31",
+    ]
+
+
+def test_horizon_caps_open_ended_schedule():
+    schedule = CourseSchedule(
+        date="2026-01-01", start_time="10:00", end_time="11:00", recurring="daily"
+    )
+
+    starts, _ = expand_schedule(schedule)
+    assert len(starts) == SCHEDULE_MAX_HORIZON_DAYS + 1
+    assert starts[-1] == np.datetime64("2026-01-01T10:00") + np.timedelta64(
+        SCHEDULE_MAX_HORIZON_DAYS, "D"
+    )
+
+    starts, _ = expand_schedule(schedule, max_horizon_days=10)
+    assert days(starts)[-1] == "2026-01-11"
+
+
+def test_weekdays_window_skips_weekend_start():
+    # 2026-01-03 是周六；开始日本身算一节课，但窗口里的周末不算
+    schedule = CourseSchedule(
+        date="2026-01-03",
+        start_time="10:00",
+        end_time="11:00",
+        recurring="weekdays",
+        recurring_end_date="2026-01-31",
+    )
+
+    starts, _ = expand_schedule(schedule)
+    assert days(starts)[:2] == ["2026-01-03", "2026-01-05"]
+
+    starts, _ = expand_schedule(
+        schedule, datetime(2026, 1, 10), datetime(2026, 1, 16, 23, 59)
+    )
+    assert days(starts) == [
+        "2026-01-12",
+        "2026-01-13",
+        "2026-01-14",
+        "2026-01-15",
+        "2026-01-16",
+    ]
+
+
+def test_weekends_window_clips_start_and_end():
+    # 2026-01-05 是周一
+    schedule = CourseSchedule(
+        date="2026-01-05",
+        start_time="10:00",
+        end_time="11:00",
+        recurring="weekends",
+        recurring_end_date="2026-01-31",
+    )
+
+    starts, _ = expand_schedule(
+        schedule, datetime(2026, 1, 11, 10, 30), datetime(2026, 1, 24, 9, 0)
+    )
+
+    # 11 号的课在窗口开始之前，24 号的课在窗口结束之后
+    assert days(starts) == ["2026-01-17", "2026-01-18"]
+
+
+def test_expand_schedules_merges_sorted():
+    schedules = [
+        CourseSchedule(
+            date="2026-01-06",
+            start_time="14:00",
+            end_time="15:00",
+            recurring="weekly",
+            recurring_end_date="2026-01-20",
+        ),
+        CourseSchedule(
+            date="2026-01-05",
+            start_time="10:00",
+            end_time="11:00",
+            recurring="weekly",
+            recurring_end_date="2026-01-19",
+        ),
+    ]
+
+    starts, ends = expand_schedules(schedules)
+
+    assert (starts[1:] >= starts[:-1]).all()
+    assert days(starts) == [
+        "2026-01-05",
+        "2026-01-06",
+        "2026-01-12",
+        "2026-01-13",
+        "2026-01-19",
+        "2026-01-20",
+    ]
+    assert (ends - starts == np.timedelta64(1, "h")).all()
@@ -0,0 +1,87 @@
+from datetime import datetime
+
+from app.models.models import (
+    LeaveRequest,
+    Program,
+    Student,
+    StudentLesson,
+    Teacher,
+    WithdrawRequest,
+)
+
+SCHEDULE = [
+    {
+        "date": "2026-01-05",
+        "start_time": "10:00",
+        "end_time": "11:00",
+        "recurring": "daily",
+        "recurring_end_date": "2026-01-30",
+    }
+]
+WINDOW = {"lessons_from": "2026-01-01T00:00:00", "lessons_to": "2026-02-01T00:00:00"}
+
+
+def seed(client, db):
+    db.add_all(
+        [
+            Teacher(name="t1", email="t1@example.com", phone="1"),
+            Program(category="c", name="p1"),
+            Student(email="s1@example.com", name="s1"),
+            Student(email="s2@example.com", name="s2"),
+        ]
+    )
+    db.commit()
+    response = client.post(
+        "/courses", json={"teacher_id": 1, "program_id": 1, "schedule": SCHEDULE}
+    )
+    assert response.status_code == 201
+    db.add_all([StudentLesson(student_id=1, lesson_id=i) for i in range(1, 21)])
+    db.add_all(
+        [
+            LeaveRequest(
+                student_id=1,
+                lesson_id=2,
+                leave_date=datetime(2026, 1, 6),
+                status="pending",
+            ),
+            WithdrawRequest(student_id=1, lesson_id=4, status="approved"),
+            WithdrawRequest(student_id=1, lesson_id=5, status="pending"),
+        ]
+    )
+    db.commit()
+
+
+def test_timetable_query_count(client, db, count_queries):
+    seed(client, db)
+    count_queries.clear()
+
+    response = client.get("/students/1/timetable", params=WINDOW)
+
+    assert response.status_code == 200
+    assert len(count_queries) <= 2
+    items = {item["id"]: item for item in response.json()["items"]}
+    # 已批准退课的课时不出现，其余 19 节都在
+    assert len(items) == 19
+    assert 4 not in items
+    assert items[2]["leave_status"] == "pending"
+    assert items[5]["withdraw_status"] == "pending"
+    assert items[1]["teacher"] == {"id": 1, "name": "t1"}
+
+
+def test_timetable_empty_student(client, db, count_queries):
+    seed(client, db)
+    count_queries.clear()
+
+    response = client.get("/students/2/timetable", params=WINDOW)
+
+    assert response.status_code == 200
+    assert response.json() == {"items": []}
+    assert len(count_queries) <= 2
+
+
+def test_timetable_unknown_student(client, db):
+    seed(client, db)
+
+    response = client.get("/students/99/timetable", params=WINDOW)
+
+    assert response.status_code == 404